@@ -6,6 +6,7 @@ import dataclasses
 import logging
 import random
 import sys
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
@@ -58,6 +59,12 @@ SCREEN_SIZE = 800
 
 BLOCKING_ZERO_TIME = 0.000001
 
+# Record layout of the tile and prop arrays returned by GameEndpoint.state_arrays().
+# type is the tile's AssetId for tiles, and the PropType for props.
+STATE_ARRAY_DTYPE = np.dtype(
+    [("a", np.int16), ("r", np.int16), ("c", np.int16), ("type", np.uint8)]
+)
+
 # I dont' think I need this anymore. This is an attempt to export the Role symbol so that users of this package can access it.
 Role = Role
 
@@ -145,6 +152,28 @@ class Action(object):
         def from_str(s: str):
             return Action.ActionCode[s]
 
+    # Used by message_to_server(). Movement actions are built by the actor, since
+    # the displacement depends on its heading.
+    _MOVEMENT_BUILDERS = {
+        ActionCode.FORWARDS: lambda actor: actor.WalkForwardsAction(),
+        ActionCode.BACKWARDS: lambda actor: actor.WalkBackwardsAction(),
+        ActionCode.TURN_LEFT: lambda actor: actor.TurnLeftAction(),
+        ActionCode.TURN_RIGHT: lambda actor: actor.TurnRightAction(),
+    }
+
+    # All other actions map directly to a message. The builder is passed the
+    # action's argument (self.action[1]), which is None for most actions.
+    _MESSAGE_BUILDERS = {
+        ActionCode.END_TURN: lambda _: EndTurnMessage(),
+        ActionCode.INTERRUPT: lambda _: InterruptMessage(),
+        ActionCode.SEND_INSTRUCTION: InstructionMessage,
+        ActionCode.INSTRUCTION_DONE: InstructionDoneMessage,
+        ActionCode.TUTORIAL_NEXT_STEP: lambda _: TutorialNextStepMessage(),
+        ActionCode.NEGATIVE_FEEDBACK: lambda _: NegativeFeedbackMessage(),
+        ActionCode.POSITIVE_FEEDBACK: lambda _: PositiveFeedbackMessage(),
+        ActionCode.LOAD_SCENARIO: LoadScenarioMessage,
+    }
+
     # Helper initialization functions.
     @staticmethod
     def Forwards():
@@ -379,35 +408,13 @@ class Action(object):
 
     def message_to_server(self, actor):
         action_code = self.action[0]
-        action = None
-        if action_code == Action.ActionCode.FORWARDS:
-            action = actor.WalkForwardsAction()
-        elif action_code == Action.ActionCode.BACKWARDS:
-            action = actor.WalkBackwardsAction()
-        elif action_code == Action.ActionCode.TURN_LEFT:
-            action = actor.TurnLeftAction()
-        elif action_code == Action.ActionCode.TURN_RIGHT:
-            action = actor.TurnRightAction()
-        elif action_code == Action.ActionCode.END_TURN:
-            return EndTurnMessage(), ""
-        elif action_code == Action.ActionCode.INTERRUPT:
-            return InterruptMessage(), ""
-        elif action_code == Action.ActionCode.SEND_INSTRUCTION:
-            return InstructionMessage(self.action[1]), ""
-        elif action_code == Action.ActionCode.INSTRUCTION_DONE:
-            return InstructionDoneMessage(self.action[1]), ""
-        elif action_code == Action.ActionCode.TUTORIAL_NEXT_STEP:
-            return TutorialNextStepMessage(), ""
-        elif action_code == Action.ActionCode.NEGATIVE_FEEDBACK:
-            return NegativeFeedbackMessage(), ""
-        elif action_code == Action.ActionCode.POSITIVE_FEEDBACK:
-            return PositiveFeedbackMessage(), ""
-        elif action_code == Action.ActionCode.LOAD_SCENARIO:
-            return LoadScenarioMessage(self.action[1]), ""
-        else:
+        build_message = Action._MESSAGE_BUILDERS.get(action_code, None)
+        if build_message is not None:
+            return build_message(self.action[1]), ""
+        build_movement = Action._MOVEMENT_BUILDERS.get(action_code, None)
+        if build_movement is None:
             return None, "Invalid lead action"
-        assert action != None, "Invalid lead action"
-        action_message = ActionsMessage([action])
+        action_message = ActionsMessage([build_movement(actor)])
         return action_message, ""
 
 
@@ -442,6 +449,21 @@ class GameEndpoint(object):
         self.render = render
         self.lobby_info = lobby_info
         self._timeout_observed = False
+        # Maps from message_from_server.MessageType -> handler method. Built
+        # once, so that _handle_message() is a single lookup per message.
+        message_type = message_from_server.MessageType
+        self._message_handlers = {
+            message_type.ACTIONS: self._handle_actions,
+            message_type.STATE_SYNC: self._handle_state_sync_message,
+            message_type.GAME_STATE: self._handle_turn_state,
+            message_type.MAP_UPDATE: self._handle_map_update,
+            message_type.OBJECTIVE: self._handle_objectives,
+            message_type.PING: self._handle_ping,
+            message_type.LIVE_FEEDBACK: self._handle_live_feedback,
+            message_type.PROP_UPDATE: self._handle_prop_update_message,
+            message_type.STATE_MACHINE_TICK: self._handle_tick,
+            message_type.TUTORIAL_RESPONSE: self._handle_tutorial_response,
+        }
         self._reset()
 
     def _reset(self):
@@ -464,6 +486,7 @@ class GameEndpoint(object):
         self.pygame_task = None
         self._timeout_observed = False
         self._tutorial_messages = []
+        self._state_arrays = None
         # Always create the display, even if render == None.
         # This lets the user access the the display object manually if they need.
         # It's a bit of a hack, because pygame can't render unless they're on the main thread.
@@ -566,13 +589,17 @@ class GameEndpoint(object):
                 f"Player is role {self._player_role} and turn {self.turn_state.turn} but sent inappropriate action: {action}"
             )
         message, reason = action.message_to_server(self.player_actor)
+        outgoing_messages = []
         if message != None:
-            logger.debug(f"Sending action: {message.type}")
-            self.socket.send_message(message)
-        for message in self.queued_messages:
-            logger.debug(f"Sending action: {message.type}")
-            self.socket.send_message(message)
+            outgoing_messages.append(message)
+        # Send queued messages (like automated ping responses) in the same batch.
+        outgoing_messages.extend(self.queued_messages)
         self.queued_messages = []
+        if len(outgoing_messages) > 0:
+            logger.debug(
+                f"Sending actions: {[message.type for message in outgoing_messages]}"
+            )
+            self.socket.send_messages(outgoing_messages)
         # Reset this variable. We want to see if while waiting for ticks, the
         # follower has moved. This allows self._can_act() to return True if
         # playing as the leader, to give live feedback on a follower move.
@@ -650,12 +677,13 @@ class GameEndpoint(object):
 
     def _wait_for_tick(self, timeout=timedelta(seconds=60)):
         """Waits for a tick"""
-        start_time = datetime.utcnow()
-        end_time = start_time + timeout
+        # Monotonic float seconds are much cheaper than datetime arithmetic.
+        deadline = time.monotonic() + timeout.total_seconds()
         while not self.over() and self.socket.connected():
-            if datetime.utcnow() > end_time:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 return False, "Timed out waiting for tick"
-            message, reason = self.socket.receive_message(end_time - datetime.utcnow())
+            message, reason = self.socket.receive_message(timedelta(seconds=remaining))
             if message is None:
                 logger.warning(f"Received None from _receive_message. Reason: {reason}")
                 continue
@@ -726,6 +754,46 @@ class GameEndpoint(object):
             self.live_feedback,
         )
 
+    def state_arrays(self):
+        """Returns the map and props as numpy record arrays.
+
+        An alternative to the object graph in GameState for agents that feed
+        observations into a model. The arrays are censored for the follower in
+        the same way as the state returned by step().
+
+        Returns:
+            A dict with keys "tiles" and "props". Each value is an np.recarray
+            with dtype STATE_ARRAY_DTYPE. Arrays are cached until the next
+            message from the server is handled, so don't modify them in place.
+        """
+        if self._state_arrays is not None:
+            return self._state_arrays
+        map_update, props, _, _, _, _ = self._state()
+        tiles = map_update.tiles if map_update is not None else []
+        tile_rows = [
+            (
+                tile.cell.coord.a,
+                tile.cell.coord.r,
+                tile.cell.coord.c,
+                tile.asset_id,
+            )
+            for tile in tiles
+        ]
+        prop_rows = [
+            (
+                prop.prop_info.location.a,
+                prop.prop_info.location.r,
+                prop.prop_info.location.c,
+                prop.prop_type.value,
+            )
+            for prop in props
+        ]
+        self._state_arrays = dict(
+            tiles=np.array(tile_rows, dtype=STATE_ARRAY_DTYPE).view(np.recarray),
+            props=np.array(prop_rows, dtype=STATE_ARRAY_DTYPE).view(np.recarray),
+        )
+        return self._state_arrays
+
     def Initialize(self, timeout=timedelta(seconds=60)):
         return self._initialize()
 
@@ -738,13 +806,14 @@ class GameEndpoint(object):
             logger.warning("Initial state already ready")
             return
 
-        end_time = datetime.utcnow() + timeout
+        deadline = time.monotonic() + timeout.total_seconds()
         logger.debug(f"Beginning INIT")
         while self.socket.connected():
-            if datetime.utcnow() > end_time:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 raise Exception("Timed out waiting for game")
             response, reason = self.socket.receive_message(
-                timeout=end_time - datetime.utcnow()
+                timeout=timedelta(seconds=remaining)
             )
             if response is None:
                 logger.warning(
@@ -806,6 +875,7 @@ class GameEndpoint(object):
                 ]:
                     logger.debug(f"Init DONE for {self._player_role}")
                     self._initial_state_ready = True
+                    self._state_arrays = None
                     if self.render:
                         self._render()
                     return True, ""
@@ -843,8 +913,7 @@ class GameEndpoint(object):
                     or net_actor.rotation_degrees != actor.heading_degrees()
                 ):
                     self._follower_moved = True
-            while actor.has_actions():
-                actor.drop()
+            actor.reset_actions()
             actor.add_action(
                 action_module.Init(
                     net_actor.actor_id, net_actor.location, net_actor.rotation_degrees
@@ -857,71 +926,84 @@ class GameEndpoint(object):
             )
 
     def _handle_message(self, message):
-        logger.debug(
-            f"Received message type {message_from_server.MessageType(message.type)} from server"
-        )
-        if message.type == message_from_server.MessageType.ACTIONS:
-            for action in message.actions:
-                if action.id in self.actors:
-                    actor = self.actors[action.id]
-                    if actor.role() == Role.FOLLOWER:
-                        self._follower_moved = True
-                    actor.add_action(action)
-                    while actor.has_actions():
-                        actor.step()
-                elif action.id in self.cards:
-                    if action.action_type not in [ActionType.OUTLINE]:
-                        logger.error(f"Received action for unknown prop: {action.id}")
-                        continue
-                    if action.border_radius <= 0.01:
-                        prop_info = self.cards[action.id].prop_info
-                        prop_info = dataclasses.replace(prop_info, border_radius=0)
-                        card_info = self.cards[action.id].card_init
-                        card_info = dataclasses.replace(card_info, selected=False)
-                        self.cards[action.id] = dataclasses.replace(
-                            self.cards[action.id],
-                            prop_info=prop_info,
-                            card_init=card_info,
-                        )
-                    else:
-                        prop_info = self.cards[action.id].prop_info
-                        prop_info = dataclasses.replace(
-                            prop_info, border_radius=action.border_radius
-                        )
-                        card_info = self.cards[action.id].card_init
-                        card_info = dataclasses.replace(card_info, selected=True)
-                        self.cards[action.id] = dataclasses.replace(
-                            self.cards[action.id],
-                            prop_info=prop_info,
-                            card_init=card_info,
-                        )
-                else:
-                    logger.error(f"Received action for unknown actor: {action.id}")
-        elif message.type == message_from_server.MessageType.STATE_SYNC:
-            self._handle_state_sync(message.state)
-        elif message.type == message_from_server.MessageType.GAME_STATE:
-            self.turn_state = message.turn_state
-        elif message.type == message_from_server.MessageType.MAP_UPDATE:
-            logger.warning(
-                f"Received map update after game started. This is unexpected."
-            )
-            self.map_update = message.map_update
-        elif message.type == message_from_server.MessageType.OBJECTIVE:
-            self.instructions = message.objectives
-        elif message.type == message_from_server.MessageType.PING:
-            self.queued_messages.append(PongMessage())
-        elif message.type == message_from_server.MessageType.LIVE_FEEDBACK:
-            self.live_feedback.append(message.live_feedback.signal)
-        elif message.type == message_from_server.MessageType.PROP_UPDATE:
-            self._handle_prop_update(message.prop_update)
-        elif message.type == message_from_server.MessageType.STATE_MACHINE_TICK:
-            return
-        elif message.type == message_from_server.MessageType.TUTORIAL_RESPONSE:
-            self._tutorial_messages.append(message.tutorial_response)
-        else:
+        self._state_arrays = None
+        # Checked explicitly so the log string isn't formatted for every message
+        # when debug logging is off.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Received message type {message.type} from server")
+        handler = self._message_handlers.get(message.type, None)
+        if handler is None:
             logger.warning(
                 f"Received unexpected message type: {message.type}. msg: {message}"
             )
+            return
+        handler(message)
+
+    def _handle_actions(self, message):
+        for action in message.actions:
+            if action.id in self.actors:
+                actor = self.actors[action.id]
+                if actor.role() == Role.FOLLOWER:
+                    self._follower_moved = True
+                actor.add_action(action)
+                while actor.has_actions():
+                    actor.step()
+            elif action.id in self.cards:
+                if action.action_type not in [ActionType.OUTLINE]:
+                    logger.error(f"Received action for unknown prop: {action.id}")
+                    continue
+                if action.border_radius <= 0.01:
+                    prop_info = self.cards[action.id].prop_info
+                    prop_info = dataclasses.replace(prop_info, border_radius=0)
+                    card_info = self.cards[action.id].card_init
+                    card_info = dataclasses.replace(card_info, selected=False)
+                    self.cards[action.id] = dataclasses.replace(
+                        self.cards[action.id],
+                        prop_info=prop_info,
+                        card_init=card_info,
+                    )
+                else:
+                    prop_info = self.cards[action.id].prop_info
+                    prop_info = dataclasses.replace(
+                        prop_info, border_radius=action.border_radius
+                    )
+                    card_info = self.cards[action.id].card_init
+                    card_info = dataclasses.replace(card_info, selected=True)
+                    self.cards[action.id] = dataclasses.replace(
+                        self.cards[action.id],
+                        prop_info=prop_info,
+                        card_init=card_info,
+                    )
+            else:
+                logger.error(f"Received action for unknown actor: {action.id}")
+
+    def _handle_state_sync_message(self, message):
+        self._handle_state_sync(message.state)
+
+    def _handle_prop_update_message(self, message):
+        self._handle_prop_update(message.prop_update)
+
+    def _handle_turn_state(self, message):
+        self.turn_state = message.turn_state
+
+    def _handle_map_update(self, message):
+        logger.warning(f"Received map update after game started. This is unexpected.")
+        self.map_update = message.map_update
+
+    def _handle_objectives(self, message):
+        self.instructions = message.objectives
+
+    def _handle_ping(self, message):
+        self.queued_messages.append(PongMessage())
+
+    def _handle_live_feedback(self, message):
+        self.live_feedback.append(message.live_feedback.signal)
+
+    def _handle_tick(self, message):
+        pass
+
+    def _handle_tutorial_response(self, message):
+        self._tutorial_messages.append(message.tutorial_response)
 
     def _render(self):
         if not self.render:
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import timedelta
-from typing import Tuple
+from typing import List, Tuple
 
 from server.messages import message_from_server, message_to_server
 
@@ -21,6 +21,15 @@ class GameSocket(ABC):
         """Send a message to the server. Blocking."""
         ...
 
+    def send_messages(self, messages: List[message_to_server.MessageToServer]):
+        """Send several messages to the server at once. Blocking.
+
+        Implementations may override this to coalesce the messages into a
+        single transmission. By default, sends each message individually.
+        """
+        for message in messages:
+            self.send_message(message)
+
     @abstractmethod
     def connected(self) -> bool:
         """Is the socket connected to a server or state machine?"""
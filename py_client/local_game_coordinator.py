@@ -61,6 +61,13 @@ class LocalSocket(GameSocket):
         state_machine_driver.drain_messages(self.actor_id, [message])
         self.local_coordinator.StepGame(self.game_name)
 
+    def send_messages(self, messages):
+        state_machine_driver = self.local_coordinator._state_machine_driver(
+            self.game_name
+        )
+        state_machine_driver.drain_messages(self.actor_id, messages)
+        self.local_coordinator.StepGame(self.game_name)
+
     def connected(self):
         return self.local_coordinator._game_exists(self.game_name)
 
@@ -1,6 +1,9 @@
 import asyncio
+import dataclasses
 import logging
 import sys
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from enum import Enum
 
@@ -9,6 +12,12 @@ import nest_asyncio
 import orjson
 import requests
 
+try:
+    # Optional. A faster drop-in event loop. See RemoteClient.__init__().
+    import uvloop
+except ImportError:
+    uvloop = None
+
 import server.messages as messages
 from py_client.client_messages import (
     AttachToScenarioMessage,
@@ -24,6 +33,26 @@ from server.messages import message_from_server, message_to_server
 
 logger = logging.getLogger(__name__)
 
+# Map and prop updates are large, and the server often resends identical
+# contents. RemoteClient caches their parsed form, keyed by message payload.
+PARSE_CACHE_TYPES = {
+    message_from_server.MessageType.MAP_UPDATE,
+    message_from_server.MessageType.PROP_UPDATE,
+}
+PARSE_CACHE_SIZE = 16
+# How cacheable messages continue after transmit_time. Lets _parse_message()
+# skip the cache for other types without hashing their payload.
+PARSE_CACHE_TYPE_FIELDS = tuple(
+    f'","type":{message_type.value},' for message_type in PARSE_CACHE_TYPES
+)
+PARSE_CACHE_TYPE_FIELDS_BYTES = tuple(
+    field.encode("utf-8") for field in PARSE_CACHE_TYPE_FIELDS
+)
+
+# Serialization settings for outgoing messages. Matches the server's encoding.
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_PASSTHROUGH_DATETIME
+ORJSON_DEFAULT = datetime.isoformat
+
 # This page defines and implements the CB2 headless client API.
 # Here is an example of how to use the API:
 #
@@ -52,6 +81,10 @@ class RemoteSocket(GameSocket):
         """Send a message to the server. Blocking."""
         self.client._send_message(message)
 
+    def send_messages(self, messages):
+        """Send several messages to the server in a single frame. Blocking."""
+        self.client._send_messages(messages)
+
     def connected(self) -> bool:
         """Is the socket connected to a server or state machine?"""
         return self.client.connected()
@@ -87,18 +120,34 @@ class RemoteClient(object):
         """
         self.session = None
         self.ws = None
+        # Background task which owns ws.receive(). See _receive_pump().
+        self._receive_task = None
+        self._inbox = None
+        # Maps from message payload (everything after transmit_time) to the
+        # parsed MessageFromServer. LRU, see _parse_message().
+        self._parse_cache = OrderedDict()
         self.render = render  # Whether to render the game with pygame.
         self.Reset()
         self.url = url
         self.lobby_name = lobby_name
-        self.event_loop = asyncio.get_event_loop()
         logging.basicConfig(level=logging.INFO)
-        # Lets us synchronously block on an event loop that's already running.
-        # This means we can encapsulate asyncio without making our users learn
-        # how to use await/async. This isn't technically needed, unless you want
-        # to be compatible with something like jupyter or anything else which
-        # requires an always-running event loop.
-        nest_asyncio.apply()
+        if uvloop is not None and not self._event_loop_running():
+            # uvloop speeds up websocket send/receive considerably. It can't be
+            # patched by nest_asyncio, so it's only used when we own the loop.
+            # Clients in the same thread share the thread's loop, so creating a
+            # second client doesn't strand the first one's session.
+            self.event_loop = asyncio.get_event_loop_policy().get_event_loop()
+            if not isinstance(self.event_loop, uvloop.Loop):
+                self.event_loop = uvloop.new_event_loop()
+                asyncio.set_event_loop(self.event_loop)
+        else:
+            self.event_loop = asyncio.get_event_loop()
+            # Lets us synchronously block on an event loop that's already running.
+            # This means we can encapsulate asyncio without making our users learn
+            # how to use await/async. This isn't technically needed, unless you want
+            # to be compatible with something like jupyter or anything else which
+            # requires an always-running event loop.
+            nest_asyncio.apply()
 
         # Detect if we're running in an interactive shell and warn the user about the server heartbeat timeout.
         if hasattr(sys, "ps1"):
@@ -106,6 +155,15 @@ class RemoteClient(object):
                 f"NOTE: You're running in an interactive shell. The server will disconnect you after {HEARTBEAT_TIMEOUT_S} seconds (by default) of inactivity. Remain active by calling Game.step(). For this reason, it's recommended not to use this library manually from a REPL loop."
             )
 
+    @staticmethod
+    def _event_loop_running():
+        """True if called from within a running event loop (e.g. jupyter)."""
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
     def Connect(self):
         """Connect to the server.
 
@@ -122,18 +180,27 @@ class RemoteClient(object):
                 f"Could not get config from {config_url}: {config_response.status_code}",
             )
         self.config = Config.from_json(config_response.text)
-        url = f"{self.url}/player_endpoint?is_bot=true"
+        # batch=true lets the server send several messages per frame.
+        url = f"{self.url}/player_endpoint?is_bot=true&batch=true"
         if self.lobby_name != "":
             url += f"&lobby_name={self.lobby_name}"
         logger.info(f"Connecting to {url}...")
-        session = aiohttp.ClientSession()
-        ws = self.event_loop.run_until_complete(session.ws_connect(url))
+        self.event_loop.run_until_complete(self._connect(url))
         logger.info(f"Connected!")
-        self.session = session
-        self.ws = ws
         self.init_state = RemoteClient.State.CONNECTED
         return True, ""
 
+    async def _connect(self, url):
+        """Opens the websocket and starts _receive_pump().
+
+        Runs on self.event_loop, so the session, inbox and receive task are all
+        bound to the loop which drives them.
+        """
+        self.session = aiohttp.ClientSession()
+        self.ws = await self.session.ws_connect(url)
+        self._inbox = asyncio.Queue()
+        self._receive_task = asyncio.create_task(self._receive_pump())
+
     def connected(self):
         return self.init_state in [
             RemoteClient.State.CONNECTED,
@@ -144,12 +211,16 @@ class RemoteClient(object):
         ]
 
     def Reset(self):
+        if self._receive_task is not None:
+            self._receive_task.cancel()
         if self.session is not None:
             self.event_loop.run_until_complete(self.session.close())
         if self.ws is not None:
             self.event_loop.run_until_complete(self.ws.close())
         self.session = None
         self.ws = None
+        self._receive_task = None
+        self._inbox = None
         self.player_role = None
         self.player_id = -1
         self.init_state = RemoteClient.State.BEGIN
@@ -231,19 +302,29 @@ class RemoteClient(object):
         Args:
             message: The message to send.
         """
+        self._send_messages([message])
+
+    def _send_messages(self, messages):
+        """Sends a batch of messages to the server in a single websocket frame.
+
+        Messages are serialized and separated by newlines. The server splits
+        the frame back into individual messages. This saves an event loop
+        round-trip and a frame per message when multiple messages are queued.
+
+        Args:
+            messages: An iterable of messages to send.
+        """
         if self.ws.closed:
             return
         if not self.connected():
             return
+        batch = self._encode_batch(messages)
+        if len(batch) == 0:
+            return
         try:
-            binary_message = orjson.dumps(
-                message,
-                option=orjson.OPT_NAIVE_UTC | orjson.OPT_PASSTHROUGH_DATETIME,
-                default=datetime.isoformat,
-            )
-            self.event_loop.run_until_complete(
-                self.ws.send_str(binary_message.decode("utf-8"))
-            )
+            # orjson already produces UTF-8, so send it as a binary frame
+            # instead of round-tripping through str.
+            self.event_loop.run_until_complete(self.ws.send_bytes(batch))
         except RuntimeError as e:
             logger.error(f"Failed to send message: {e}")
             self.init_state = RemoteClient.State.ERROR
@@ -251,6 +332,18 @@ class RemoteClient(object):
             logger.error(f"Connection reset: {e}")
             self.init_state = RemoteClient.State.CONNECTED
 
+    @staticmethod
+    def _encode_batch(messages):
+        """Serializes messages into one newline-separated websocket frame."""
+        batch = bytearray()
+        for message in messages:
+            if len(batch) > 0:
+                batch += b"\n"
+            batch += orjson.dumps(
+                message, option=ORJSON_OPTIONS, default=ORJSON_DEFAULT
+            )
+        return bytes(batch)
+
     def _join_queue(self, queue_type=QueueType.DEFAULT, e_uuid: str = ""):
         """Sends a join queue message to the server."""
         if self.init_state not in [
@@ -286,13 +379,13 @@ class RemoteClient(object):
         """
         if self.init_state != RemoteClient.State.IN_QUEUE:
             return False, "Not in queue, yet waiting for game."
-        start_time = datetime.utcnow()
-        end_time = start_time + timeout
+        deadline = time.monotonic() + timeout.total_seconds()
         while self.connected():
-            if datetime.utcnow() > end_time:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 return False, "Timed out waiting for game"
             response, reason = self._receive_message(
-                timeout=end_time - datetime.utcnow()
+                timeout=timedelta(seconds=remaining)
             )
             if response is None:
                 logger.warn(
@@ -315,7 +408,7 @@ class RemoteClient(object):
                             RemoteSocket(self), self.config, self.render
                         )
                         result, reason = self.game._initialize(
-                            end_time - datetime.utcnow()
+                            timedelta(seconds=deadline - time.monotonic())
                         )
                         assert result, f"Failed to initialize game: {reason}"
                         self.init_state = RemoteClient.State.GAME_STARTED
@@ -333,15 +426,64 @@ class RemoteClient(object):
                         )
         return False, "Disconnected"
 
-    def _receive_message(self, timeout=timedelta(minutes=1)):
+    async def _receive_pump(self):
+        """Background task which reads from the websocket into self._inbox.
+
+        This runs whenever the event loop is active (sends, receives), so
+        messages are pulled off the socket as they arrive rather than with one
+        ws.receive() call per _receive_message(). Exits once the socket closes.
+        On exit, for any reason, puts None in the inbox to wake up readers.
+        """
+        inbox = self._inbox
         try:
-            message = self.event_loop.run_until_complete(
-                self.ws.receive(timeout=timeout.total_seconds())
-            )
-        except asyncio.TimeoutError:
-            return None, "Timeout waiting for message."
+            while True:
+                message = await self.ws.receive()
+                if message.type in [aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY]:
+                    # A frame may hold several newline-separated messages.
+                    separator = (
+                        "\n" if message.type == aiohttp.WSMsgType.TEXT else b"\n"
+                    )
+                    for data in message.data.split(separator):
+                        if len(data) > 0:
+                            await inbox.put(
+                                aiohttp.WSMessage(message.type, data, message.extra)
+                            )
+                    continue
+                await inbox.put(message)
+                if message.type in [
+                    aiohttp.WSMsgType.CLOSE,
+                    aiohttp.WSMsgType.CLOSED,
+                    aiohttp.WSMsgType.ERROR,
+                ]:
+                    return
+        finally:
+            inbox.put_nowait(None)
+
+    def _receive_pump_exit_reason(self):
+        """Explains why _receive_pump() exited, logging any exception it raised."""
+        task = self._receive_task
+        if not task.done() or task.cancelled() or task.exception() is None:
+            return "Socket closed."
+        logger.error("Websocket receive failed.", exc_info=task.exception())
+        return f"Websocket receive failed: {task.exception()!r}"
+
+    def _receive_message(self, timeout=timedelta(minutes=1)):
+        if self._inbox is None:
+            return None, "Not connected."
+        # Skip the event loop entirely if a message is already waiting.
+        if not self._inbox.empty():
+            message = self._inbox.get_nowait()
+        elif self._receive_task.done():
+            return None, self._receive_pump_exit_reason()
+        else:
+            try:
+                message = self.event_loop.run_until_complete(
+                    asyncio.wait_for(self._inbox.get(), timeout.total_seconds())
+                )
+            except asyncio.TimeoutError:
+                return None, "Timeout waiting for message."
         if message is None:
-            return None, "None received from websocket.receive()"
+            return None, self._receive_pump_exit_reason()
         if message.type == aiohttp.WSMsgType.ERROR:
             return None, f"Received websocket error: {message.data}"
         if message.type == aiohttp.WSMsgType.CLOSED:
@@ -350,10 +492,43 @@ class RemoteClient(object):
         if message.type == aiohttp.WSMsgType.CLOSE:
             self.init_state = RemoteClient.State.BEGIN
             return None, "Socket closing."
-        if message.type != aiohttp.WSMsgType.TEXT:
+        if message.type not in [aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY]:
             return (
                 None,
                 f"Unexpected message type: {message.type}. data: {message.data}",
             )
-        response = message_from_server.MessageFromServer.from_json(message.data)
+        response = self._parse_message(message.data)
         return response, ""
+
+    def _parse_message(self, data):
+        """Parses a MessageFromServer, reusing cached map & prop updates.
+
+        The server serializes transmit_time as the first field, so everything
+        after it identifies the contents of the message. Only map and prop
+        updates are looked up. If the contents match a recently parsed one, the
+        cached (immutable) payload is reused and only transmit_time is parsed.
+        """
+        is_text = isinstance(data, str)
+        prefix = '{"transmit_time":"' if is_text else b'{"transmit_time":"'
+        separator = '","type":' if is_text else b'","type":'
+        type_fields = (
+            PARSE_CACHE_TYPE_FIELDS if is_text else PARSE_CACHE_TYPE_FIELDS_BYTES
+        )
+        split = data.find(separator) if data.startswith(prefix) else -1
+        if split < 0 or not data.startswith(type_fields, split):
+            return message_from_server.MessageFromServer.from_bytes(data)
+        key = data[split:]
+        cached = self._parse_cache.get(key, None)
+        if cached is not None:
+            self._parse_cache.move_to_end(key)
+            transmit_time = data[len(prefix) : split]
+            if not is_text:
+                transmit_time = transmit_time.decode("utf-8")
+            return dataclasses.replace(
+                cached, transmit_time=datetime.fromisoformat(transmit_time)
+            )
+        response = message_from_server.MessageFromServer.from_bytes(data)
+        self._parse_cache[key] = response
+        if len(self._parse_cache) > PARSE_CACHE_SIZE:
+            self._parse_cache.popitem(last=False)
+        return response
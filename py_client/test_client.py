@@ -38,7 +38,7 @@ async def wait_for_join_messages(ws):
         if message.type == aiohttp.WSMsgType.ERROR:
             print(f"Received error: {message.data}")
             continue
-        if message.type != aiohttp.WSMsgType.TEXT:
+        if message.type not in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
             print(
                 f"wait_for_join_messages received unexpected message type: {message.type}. data: {message.data}"
             )
@@ -132,10 +132,7 @@ async def wait_for_turn(ws, player_id, role, receive_times):
         if message.type == aiohttp.WSMsgType.PONG:
             print(f"wait_for_turn received PONG message.")
             return
-        if message.type == aiohttp.WSMsgType.BINARY:
-            print(f"wait_for_turn received BINARY message.")
-            return
-        if message.type != aiohttp.WSMsgType.TEXT:
+        if message.type not in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
             print(
                 f"wait_for_turn received unexpected message type: {message.type}. data: {message.data}"
             )
@@ -0,0 +1,208 @@
+"""Unit tests for the headless client's websocket handling."""
+import asyncio
+import dataclasses
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+
+from py_client.remote_client import RemoteClient
+from server.config.config import Config
+from server.messages import message_from_server, message_to_server
+from server.messages.map_update import MapMetadata, MapUpdate
+from server.messages.turn_state import TurnComplete
+from server.util import JsonSerialize
+
+
+class FakeServer(object):
+    """Minimal stand-in for the server's config and player endpoints.
+
+    Runs its own event loop in a background thread. Sends a ping when a player
+    connects, and replies with a ping to every message in a received frame.
+    """
+
+    def __init__(self):
+        self.frames = []  # Raw websocket frames received, in order.
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get("/data/config", self._config)
+        app.router.add_get("/player_endpoint", self._player_endpoint)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        _, port = self._runner.addresses[0]
+        self.url = f"http://127.0.0.1:{port}"
+        self._started.set()
+        self._loop.run_forever()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _config(self, request):
+        return web.Response(text=Config().to_json())
+
+    async def _player_endpoint(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        ping = JsonSerialize(message_from_server.PingMessageFromServer(), pretty=False)
+        await ws.send_str(ping)
+        async for msg in ws:
+            if msg.type not in [aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY]:
+                break
+            self.frames.append(msg.data)
+            for line in msg.data.splitlines():
+                if len(line) > 0:
+                    await ws.send_str(ping)
+        return ws
+
+
+class RemoteClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeServer()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.Reset()
+        self.server.stop()
+
+    def _connect_client(self):
+        client = RemoteClient(self.server.url, lobby_name="")
+        self.clients.append(client)
+        return client
+
+    def _assert_pinged(self, client):
+        message, reason = client._receive_message(timeout=timedelta(seconds=5))
+        self.assertIsNotNone(message, reason)
+        self.assertEqual(message.type, message_from_server.MessageType.PING)
+
+    def test_two_clients_in_one_thread(self):
+        """A leader & follower client created in one thread can both talk."""
+        leader = self._connect_client()
+        follower = self._connect_client()
+        for client in [leader, follower]:
+            connected, reason = client.Connect()
+            self.assertTrue(connected, reason)
+        for client in [leader, follower]:
+            self._assert_pinged(client)
+        # Interleave sends and receives, as the two players would.
+        for _ in range(3):
+            for client in [leader, follower]:
+                client._send_message(
+                    message_to_server.MessageToServer(
+                        datetime.utcnow(),
+                        message_to_server.MessageType.TURN_COMPLETE,
+                        turn_complete=TurnComplete(),
+                    )
+                )
+                self._assert_pinged(client)
+        self.assertEqual(len(self.server.frames), 6)
+
+    def test_receive_failure_is_reported(self):
+        """A failed websocket read is reported to the reader right away."""
+        client = self._connect_client()
+        with mock.patch.object(
+            aiohttp.ClientWebSocketResponse,
+            "receive",
+            side_effect=ConnectionResetError("Test connection reset"),
+        ):
+            connected, reason = client.Connect()
+            self.assertTrue(connected, reason)
+            start = time.monotonic()
+            message, reason = client._receive_message(timeout=timedelta(seconds=30))
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertIsNone(message)
+        self.assertIn("Test connection reset", reason)
+        # Later reads keep reporting the failure.
+        message, reason = client._receive_message(timeout=timedelta(seconds=30))
+        self.assertIsNone(message)
+        self.assertIn("Test connection reset", reason)
+
+
+class ParseCacheTest(unittest.TestCase):
+    """Tests RemoteClient's cache of parsed map & prop updates."""
+
+    def setUp(self):
+        # Never connects, so the URL is unused.
+        self.client = RemoteClient("http://localhost:0", lobby_name="")
+        map_update = MapUpdate(0, 0, [], MapMetadata([], [], [], [], 0))
+        self.first = message_from_server.MapUpdateFromServer(map_update)
+        self.second = dataclasses.replace(
+            self.first, transmit_time=self.first.transmit_time + timedelta(seconds=1)
+        )
+
+    def _assert_reused(self, first_data, second_data):
+        first = self.client._parse_message(first_data)
+        second = self.client._parse_message(second_data)
+        self.assertEqual(first.transmit_time, self.first.transmit_time)
+        self.assertEqual(second.transmit_time, self.second.transmit_time)
+        self.assertIs(second.map_update, first.map_update)
+
+    def test_cached_map_update_from_bytes(self):
+        self._assert_reused(self.first.to_bytes(), self.second.to_bytes())
+
+    def test_cached_map_update_from_str(self):
+        self._assert_reused(
+            self.first.to_bytes().decode("utf-8"),
+            self.second.to_bytes().decode("utf-8"),
+        )
+
+    def test_other_types_not_cached(self):
+        ping = message_from_server.PingMessageFromServer()
+        for data in [ping.to_bytes(), ping.to_bytes().decode("utf-8")]:
+            response = self.client._parse_message(data)
+            self.assertEqual(response.type, message_from_server.MessageType.PING)
+        self.assertEqual(len(self.client._parse_cache), 0)
+
+
+class EncodeBatchTest(unittest.TestCase):
+    """Tests that client message batches split back into the same messages."""
+
+    def _turn_complete(self):
+        return message_to_server.MessageToServer(
+            datetime.utcnow(),
+            message_to_server.MessageType.TURN_COMPLETE,
+            turn_complete=TurnComplete(),
+        )
+
+    def test_batch_round_trip(self):
+        sent = [self._turn_complete(), self._turn_complete(), self._turn_complete()]
+        frame = RemoteClient._encode_batch(sent)
+        self.assertEqual(frame.count(b"\n"), 2)
+        self.assertFalse(frame.endswith(b"\n"))
+        received = message_to_server.MessageToServer.list_from_frame(frame)
+        self.assertEqual(len(received), len(sent))
+        for sent_message, received_message in zip(sent, received):
+            self.assertEqual(received_message.type, sent_message.type)
+            self.assertEqual(
+                received_message.transmit_time.replace(tzinfo=None),
+                sent_message.transmit_time,
+            )
+
+    def test_single_message_has_no_separator(self):
+        frame = RemoteClient._encode_batch([self._turn_complete()])
+        self.assertNotIn(b"\n", frame)
+        self.assertEqual(
+            len(message_to_server.MessageToServer.list_from_frame(frame)), 1
+        )
+
+    def test_empty_batch(self):
+        self.assertEqual(RemoteClient._encode_batch([]), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import logging
+from collections import deque
 from datetime import datetime
-from queue import Queue
 
 from mashumaro.types import SerializableType
 
@@ -19,7 +19,7 @@ class Actor(SerializableType, use_annotations=True):
         self._asset_id = asset_id
         self._realtime = realtime
         self._action_start_timestamp = datetime.min
-        self._actions = Queue()
+        self._actions = deque()
         self._location = spawn
         self._heading_degrees = spawn_rotation_degrees
         self._projected_location = spawn
@@ -67,10 +67,10 @@ class Actor(SerializableType, use_annotations=True):
             )
             self._projected_heading += action.rotation
             self._projected_heading %= 360
-        self._actions.put(action)
+        self._actions.append(action)
 
     def has_actions(self):
-        return not self._actions.empty()
+        return len(self._actions) > 0
 
     def location(self):
         return self._location
@@ -89,7 +89,7 @@ class Actor(SerializableType, use_annotations=True):
 
     def peek(self):
         """Peeks at the next action without consuming it."""
-        return self._actions.queue[0]
+        return self._actions[0]
 
     # This is used for the tutorial automated agent. A realtime actor processes
     # actions in realtime. Instead of actions occurring immediately (and leaving
@@ -151,7 +151,7 @@ class Actor(SerializableType, use_annotations=True):
         """Executes & consumes an action from the queue."""
         if not self.has_actions():
             return
-        action = self._actions.get()
+        action = self._actions.popleft()
         if action.action_type == ActionType.INIT:
             self._location = action.displacement
             self._heading_degrees = action.rotation
@@ -167,5 +167,12 @@ class Actor(SerializableType, use_annotations=True):
         """Drops an action instead of acting upon it."""
         if not self.has_actions():
             return
-        _ = self._actions.get()
+        _ = self._actions.popleft()
+        self._action_start_timestamp = datetime.utcnow()
+
+    def reset_actions(self):
+        """Drops all pending actions at once."""
+        if not self.has_actions():
+            return
+        self._actions.clear()
         self._action_start_timestamp = datetime.utcnow()
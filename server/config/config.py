@@ -1,4 +1,5 @@
 """ Defines datastructures for configuring the CB2 server. """
+import functools
 import logging
 import pathlib
 from dataclasses import dataclass, field
@@ -79,6 +80,19 @@ def ReadServerConfigOrDie(config_path):
     return ReadConfigOrDie(config_path)
 
 
+@functools.lru_cache(maxsize=None)
+def _data_directory(data_prefix: str) -> pathlib.Path:
+    # If data_prefix is None or empty string, use appdirs. Else use the prefix.
+    if data_prefix is None or len(data_prefix) == 0:
+        return pathlib.Path(appdirs.user_data_dir("cb2-game-dev")).expanduser()
+    return pathlib.Path(data_prefix).expanduser()
+
+
+@functools.lru_cache(maxsize=None)
+def _data_path(data_prefix: str, suffix: str) -> pathlib.Path:
+    return pathlib.Path(_data_directory(data_prefix), suffix).expanduser()
+
+
 @dataclass
 class DataConfig(DataClassJSONMixin):
     name: str = ""  # The name of the config.
@@ -310,35 +324,26 @@ class Config(DataClassJSONMixin):
     exception_log_interval: int = 60
     """The number of seconds between exception log dumps."""
 
-    # Data path accessors that add the requisite data_prefix.
+    # Data path accessors that add the requisite data_prefix. Paths are memoized
+    # on (data_prefix, suffix), so repeated calls don't re-query appdirs or
+    # re-expand the user directory.
     def data_directory(self):
-        # If data_prefix is None or empty string, use appdirs. Else use the prefix.
-        if self.data_prefix is None or len(self.data_prefix) == 0:
-            return pathlib.Path(appdirs.user_data_dir("cb2-game-dev")).expanduser()
-        return pathlib.Path(self.data_prefix).expanduser()
+        return _data_directory(self.data_prefix)
 
     def record_directory(self):
-        return pathlib.Path(
-            self.data_directory(), self.record_directory_suffix
-        ).expanduser()
+        return _data_path(self.data_prefix, self.record_directory_suffix)
 
     def assets_directory(self):
-        return pathlib.Path(
-            self.data_directory(), self.assets_directory_suffix
-        ).expanduser()
+        return _data_path(self.data_prefix, self.assets_directory_suffix)
 
     def database_path(self):
-        return pathlib.Path(
-            self.data_directory(), self.database_path_suffix
-        ).expanduser()
+        return _data_path(self.data_prefix, self.database_path_suffix)
 
     def backup_database_path(self):
-        return pathlib.Path(
-            self.data_directory(), self.backup_db_path_suffix
-        ).expanduser()
+        return _data_path(self.data_prefix, self.backup_db_path_suffix)
 
     def exception_directory(self):
-        return pathlib.Path(self.data_directory(), self.exception_prefix).expanduser()
+        return _data_path(self.data_prefix, self.exception_prefix)
 
     def data_config(self) -> DataConfig:
         return DataConfig(
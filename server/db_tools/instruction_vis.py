@@ -3,6 +3,7 @@
 import json
 import logging
 import pathlib
+from collections import defaultdict
 
 import fire
 import peewee
@@ -46,16 +47,7 @@ SCREEN_SIZE = 800
 
 
 def draw_wrapped(display, instruction_text, max_width=50):
-    words = instruction_text.split(" ")
-    lines = []
-    current_line = ""
-    for word in words:
-        if len(current_line) + len(word) > max_width:
-            lines.append(current_line)
-            current_line = word
-        else:
-            current_line += " " + word
-    lines.append(current_line)
+    lines = visualize.wrap_text(instruction_text, max_width)
     for i, line in enumerate(lines):
         (line_text, _) = INSTRUCTION_FONT.render(line, pygame.Color(90, 90, 90))
         display._screen.blit(
@@ -169,6 +161,14 @@ def main(
         first_map_update = map_update_msg.MapUpdate.from_json(map_events.get().data)
         first_prop_update = prop_msg.PropUpdate.from_json(prop_updates.get().data)
         initial_cards = [Card.FromProp(prop) for prop in first_prop_update.props]
+        # Fetch every move and feedback event in the game up front, rather than
+        # querying for them once per instruction.
+        moves_by_instruction = defaultdict(list)
+        for move in game_events.where(Event.type == EventType.ACTION):
+            moves_by_instruction[move.parent_event_id].append(move)
+        feedbacks_by_move = defaultdict(list)
+        for feedback in game_events.where(Event.type == EventType.LIVE_FEEDBACK):
+            feedbacks_by_move[feedback.parent_event_id].append(feedback)
         instructions = game_events.where(Event.type == EventType.INSTRUCTION_SENT)
         for instruction in instructions:
             activation_query = instruction.children.where(
@@ -199,13 +199,10 @@ def main(
                 card.prop() for card in cards_by_location.values() if card is not None
             ]
 
-            moves = instruction.children.where(Event.type == EventType.ACTION)
-            feedbacks = (
-                game_events.select()
-                .where(
-                    Event.parent_event << moves, Event.type == EventType.LIVE_FEEDBACK
-                )
-                .order_by(Event.server_time)
+            moves = moves_by_instruction[instruction.id]
+            feedbacks = sorted(
+                (feedback for move in moves for feedback in feedbacks_by_move[move.id]),
+                key=lambda feedback: feedback.server_time,
             )
 
             dt_string = instruction.server_time.strftime("%Y-%m-%d_%H-%M-%S")
@@ -1,11 +1,11 @@
 # Creates a set of graphics where an instruction is displayed on the left, and
 # the follower's pathway is displayed on the right.
+import functools
 import random
 
 import fire
 import pygame
 import pygame.freetype
-import schemas.defaults
 import schemas.game
 from config.config import Config
 from db_tools import db_utils
@@ -36,19 +36,17 @@ if 1:
 SCREEN_SIZE = 800
 
 
+@functools.lru_cache(maxsize=4096)
+def render_line(line):
+    """Renders a line of instruction text. Cached, as instructions share lines."""
+    (line_text, _) = INSTRUCTION_FONT.render(line, pygame.Color(90, 90, 90))
+    return line_text
+
+
 def draw_wrapped(display, instruction_text, max_width=50):
-    words = instruction_text.split(" ")
-    lines = []
-    current_line = ""
-    for word in words:
-        if len(current_line) + len(word) > max_width:
-            lines.append(current_line)
-            current_line = word
-        else:
-            current_line += " " + word
-    lines.append(current_line)
+    lines = visualize.wrap_text(instruction_text, max_width)
     for i, line in enumerate(lines):
-        (line_text, _) = INSTRUCTION_FONT.render(line, pygame.Color(90, 90, 90))
+        line_text = render_line(line)
         display._screen.blit(
             line_text,
             (
@@ -91,29 +89,40 @@ def main(
     config = ReadConfigOrDie(config_filepath)
 
     print(f"Reading database from {config.database_path()}")
-    # Setup the sqlite database used to record game actions.
-    base.SetDatabase(config)
+    # This tool only reads from the database. Open it read-only with pragmas
+    # suited to scanning every instruction.
+    base.SetDatabaseReadOnly(config)
     base.ConnectDatabase()
-    base.CreateTablesIfNotExists(schemas.defaults.ListDefaultTables())
 
     games = (
         db_utils.ListAnalysisGames(config)
         if research_only
         else db_utils.ListMturkGames()
     )
-    words = set()
-    instruction_list = []
+    # Reservoir sample instructions in a single streaming pass, so only
+    # `number` instruction texts are held in memory at once.
+    sample = []
+    instructions_seen = 0
     for game in games:
-        instructions = Instruction.select().join(Game).where(Instruction.game == game)
-        for instruction in instructions:
+        instructions = (
+            Instruction.select(Instruction.text)
+            .join(Game)
+            .where(Instruction.game == game)
+        )
+        for instruction in instructions.iterator():
             if len(search_term) > 0 and search_term in instruction.text:
                 print(f"Search term found in game {game.id}: {instruction.text}")
-            words.update(instruction.text.split(" "))
-            instruction_list.append(instruction.text)
-
-    if number < 0:
-        number = len(instruction_list)
-    sample = random.sample(instruction_list, min(number, len(instruction_list)))
+            instructions_seen += 1
+            if number < 0 or len(sample) < number:
+                sample.append(instruction.text)
+                continue
+            j = random.randrange(instructions_seen)
+            if j < number:
+                sample[j] = instruction.text
+
+    # The reservoir keeps early instructions in place. Shuffle to match the
+    # random ordering of random.sample().
+    random.shuffle(sample)
     if len(search_term) == 0:
         for instruction in sample:
             print(instruction)
@@ -64,7 +64,7 @@ def UpdateLeaderExperience(game_record):
     if leader_experience is None:
         logger.info(f"No lexp entry found.")
         return
-    print(f"Leader EXP ID: {leader_experience.id}")
+    logger.info(f"Leader EXP ID: {leader_experience.id}")
     update_leader_stats(leader_experience, game_record)
 
 
@@ -79,7 +79,7 @@ def UpdateFollowerExperience(game_record):
     if follower_experience is None:
         logger.info(f"No fexp entry found.")
         return
-    print(f"Follower EXP ID: {follower_experience.id}")
+    logger.info(f"Follower EXP ID: {follower_experience.id}")
     update_follower_stats(follower_experience, game_record)
 
 
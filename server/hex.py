@@ -9,6 +9,8 @@ from mashumaro.mixins.json import DataClassJSONMixin
 
 logger = logging.getLogger()
 
+SQRT_3 = math.sqrt(3)
+
 
 class LegacyHecsCoord(DataClassJSONMixin):
     __slots__ = ("A", "R", "C")
@@ -95,9 +97,7 @@ class HecsCoord(DataClassJSONMixin):
         """Returns the distance between this Hecs coordinate and another Hecs coordinate."""
         self_cart = self.cartesian()
         other_cart = other.cartesian()
-        return math.sqrt(
-            (self_cart[0] - other_cart[0]) ** 2 + (self_cart[1] - other_cart[1]) ** 2
-        )
+        return math.hypot(self_cart[0] - other_cart[0], self_cart[1] - other_cart[1])
 
     def is_adjacent_to(self, other):
         displacement = HecsCoord.sub(other, self)
@@ -115,13 +115,14 @@ class HecsCoord(DataClassJSONMixin):
         neighbor_index = (int(heading / 60.0)) % 6
         if neighbor_index < 0:
             neighbor_index += 6
-        return self.neighbors()[neighbor_index]
+        # Only compute the one neighbor we need, in neighbors() order.
+        return _NEIGHBOR_FUNCTIONS[neighbor_index](self)
 
     def cartesian(self):
         """Calculate the cartesian coordinates of this Hecs coordinate."""
         return (
             0.5 * self.a + self.c,
-            math.sqrt(3) / 2.0 * self.a + math.sqrt(3) * self.r,
+            SQRT_3 / 2.0 * self.a + SQRT_3 * self.r,
         )
 
     # https://en.wikipedia.org/wiki/Hexagonal_Efficient_Coordinate_System#Negation
@@ -139,6 +140,17 @@ class HecsCoord(DataClassJSONMixin):
         return self.a == other.a and self.r == other.r and self.c == other.c
 
 
+# Neighbor functions, in the same order as HecsCoord.neighbors().
+_NEIGHBOR_FUNCTIONS = (
+    HecsCoord.up_right,
+    HecsCoord.right,
+    HecsCoord.down_right,
+    HecsCoord.down_left,
+    HecsCoord.left,
+    HecsCoord.up_left,
+)
+
+
 @dataclass(frozen=True)
 class Edges(IntEnum):
     UPPER_RIGHT = 0
@@ -192,8 +204,11 @@ class HexBoundary(DataClassJSONMixin):
         return (edge + 3) % 6
 
     def rotate_clockwise(self, turns):
-        for i in range(turns):
-            self.edges = ((self.edges << 1) | (self.edges >> 5)) & 0x3F
+        # Rotating 6 turns is the identity, so rotate once by the remainder.
+        turns = turns % 6 if turns > 0 else 0
+        if turns == 0:
+            return
+        self.edges = ((self.edges << turns) | (self.edges >> (6 - turns))) & 0x3F
 
     def set_edge_between(self, a, b):
         """Sets the edge between two HECS coordinates, if this cell is at location a and the neighbor is at location b."""
@@ -218,6 +233,7 @@ class HexBoundary(DataClassJSONMixin):
 
 @dataclass(unsafe_hash=True)
 class HexCell(DataClassJSONMixin):
+    __slots__ = ("coord", "boundary", "height", "layer")
     coord: HecsCoord
     boundary: HexBoundary
     height: float
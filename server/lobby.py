@@ -410,7 +410,7 @@ class Lobby(ABC):
                     self.boot_from_queue(leader, "Error creating room.")
                     self.boot_from_queue(follower, "Error creating room.")
                     continue
-                print("Creating new game " + room.name())
+                logger.info("Creating new game " + room.name())
                 leader_id = room.add_player(leader, Role.LEADER)
                 follower_id = room.add_player(follower, Role.FOLLOWER)
                 self._remotes[leader] = SocketInfo(room.id(), leader_id, Role.LEADER)
@@ -618,7 +618,7 @@ class Lobby(ABC):
         room = self.create_room(game_id, game_record, RoomType.TUTORIAL, tutorial_name)
         if room is None:
             return None
-        print("Creating new tutorial room " + room.name())
+        logger.info("Creating new tutorial room " + room.name())
         role = RoleFromTutorialName(tutorial_name)
         player_id = room.add_player(player, role)
         self._remotes[player] = SocketInfo(room.id(), player_id, role)
@@ -647,7 +647,7 @@ class Lobby(ABC):
         room = self.create_room(game_id, game_record, RoomType.REPLAY)
         if room is None:
             return None
-        print("Creating new replay room " + room.name())
+        logger.info("Creating new replay room " + room.name())
         player_id = room.add_player(player, Role.LEADER)
         self._remotes[player] = SocketInfo(room.id(), player_id, Role.LEADER)
         return room
@@ -896,7 +896,7 @@ class Lobby(ABC):
     def handle_cancel_request(self, request, ws):
         # Iterate through the queue of followers and leaders,
         # removing the given socket.
-        print("Received queue cancel request from : " + str(ws))
+        logger.info("Received queue cancel request from : " + str(ws))
         self.remove_socket_from_queue(ws)
 
     def handle_request(self, request: message_to_server.MessageToServer, ws):
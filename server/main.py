@@ -4,6 +4,7 @@ import dataclasses
 import hashlib
 import json
 import logging
+import logging.handlers
 import multiprocessing as mp
 import os
 import pathlib
@@ -27,6 +28,12 @@ from aiohttp import web
 from dateutil import parser, tz
 from playhouse.sqlite_ext import SqliteExtDatabase
 
+try:
+    # Optional. A faster drop-in event loop. See main().
+    import uvloop
+except ImportError:
+    uvloop = None
+
 import server.db_tools.db_utils as db_utils
 import server.leaderboard as leaderboard
 import server.schemas as schemas
@@ -66,6 +73,12 @@ BOT_SANDBOX = "bot-sandbox"
 
 logger = logging.getLogger()
 
+# How long clients may cache an asset before revalidating it with its ETag.
+ASSET_CACHE_MAX_AGE_S = 24 * 60 * 60
+
+# Longest time stream_game_state() sleeps waiting on game messages for a player.
+STREAM_IDLE_TIMEOUT_S = 0.1
+
 google_authenticator = GoogleAuthenticator()
 user_info_fetcher = UserInfoFetcher()
 client_exception_logger = ClientExceptionLogger()
@@ -94,11 +107,18 @@ async def transmit_bytes(ws, message):
     remote.last_message_down = time.time()
 
     try:
-        await ws.send_str(message.decode("utf-8"))
+        # Send the encoded JSON as-is. Clients accept binary frames, and this
+        # skips decoding and re-validating the UTF-8 for every message.
+        await ws.send_bytes(message)
     except ConnectionResetError:
         pass
 
 
+async def transmit_message(ws, message):
+    """Encodes a MessageFromServer once and transmits the resulting bytes."""
+    await transmit_bytes(ws, message.to_bytes())
+
+
 @routes.get("/")
 async def Index(request):
     return web.FileResponse("server/www/index.html")
@@ -1089,23 +1109,24 @@ async def stream_game_state(request, ws, lobby):
     menu_options_updated = False  # Whether the menu options have been transmitted.
     while not ws.closed:
         await asyncio.sleep(0)
-        poll_period = time.time() - last_loop
+        now = time.time()
+        poll_period = now - last_loop
         if (poll_period) > 0.2:
             logging.warning(
                 f"Transmit socket for iphash {remote.hashed_ip} port {remote.client_port}, slow poll period of {poll_period}s"
             )
-        last_loop = time.time()
+        last_loop = now
         # If not in a room, drain messages from the room manager.
         message = lobby.drain_message(ws)
         if message is not None:
-            await transmit_bytes(ws, orjson.dumps(message, option=orjson.OPT_NAIVE_UTC))
+            await transmit_message(ws, message)
 
         # If the menu options have been updated, send them to the client.
         if not menu_options_updated:
             menu_options_updated = True
             message = message_from_server.MenuOptionsFromServer(lobby.menu_options(ws))
             # Wait 10ms first,
-            await transmit_bytes(ws, orjson.dumps(message, option=orjson.OPT_NAIVE_UTC))
+            await transmit_message(ws, message)
 
         # Handle any authentication confirmations.
         confirmations = google_authenticator.fill_auth_confirmations(ws)
@@ -1116,9 +1137,7 @@ async def stream_game_state(request, ws, lobby):
                 message = message_from_server.GoogleAuthConfirmationFromServer(
                     confirmation
                 )
-                await transmit_bytes(
-                    ws, orjson.dumps(message, option=orjson.OPT_NAIVE_UTC)
-                )
+                await transmit_message(ws, message)
 
         # Fill userinfo responses.
         userinfo_responses = user_info_fetcher.fill_user_infos(ws)
@@ -1126,9 +1145,7 @@ async def stream_game_state(request, ws, lobby):
             for userinfo_response in userinfo_responses:
                 message = message_from_server.UserInfoFromServer(userinfo_response)
                 logger.info(f"message: {message}")
-                await transmit_bytes(
-                    ws, orjson.dumps(message, option=orjson.OPT_NAIVE_UTC)
-                )
+                await transmit_message(ws, message)
 
         if not lobby.socket_in_room(ws):
             if was_in_room:
@@ -1154,40 +1171,72 @@ async def stream_game_state(request, ws, lobby):
             # await asyncio.sleep(1.0)
             message = lobby.drain_message(ws)
             if message is not None:
-                await transmit_bytes(
-                    ws,
-                    orjson.dumps(
-                        message,
-                        option=orjson.OPT_NAIVE_UTC | orjson.OPT_PASSTHROUGH_DATETIME,
-                        default=datetime.isoformat,
-                    ),
-                )
+                await transmit_message(ws, message)
             # await asyncio.sleep(1.0)
             continue
 
         # Send a ping every 10 seconds.
         if (datetime.now(timezone.utc) - remote.last_ping).total_seconds() > 10.0:
             remote.last_ping = datetime.now(timezone.utc)
-            await transmit_bytes(
-                ws,
-                orjson.dumps(
-                    message_from_server.PingMessageFromServer(),
-                    option=orjson.OPT_NAIVE_UTC | orjson.OPT_PASSTHROUGH_DATETIME,
-                    default=datetime.isoformat,
-                ),
-            )
+            await transmit_message(ws, message_from_server.PingMessageFromServer())
+
+        # Messages are filled pre-encoded, as they're also encoded for logging.
+        out_payloads = []
+        if room.fill_messages(player_id, out_payloads):
+            if remote.batch_messages and len(out_payloads) > 1:
+                # Send everything queued this tick in a single frame.
+                await transmit_bytes(ws, b"\n".join(out_payloads))
+            else:
+                for payload in out_payloads:
+                    await transmit_bytes(ws, payload)
+        else:
+            # Sleep until the game has messages for this player. The timeout
+            # bounds how long pings and lobby/auth messages above can wait.
+            await room.wait_for_messages(player_id, STREAM_IDLE_TIMEOUT_S)
 
-        out_messages = []
-        if room.fill_messages(player_id, out_messages):
-            for message in out_messages:
-                await transmit_bytes(
-                    ws,
-                    orjson.dumps(
-                        message,
-                        option=orjson.OPT_NAIVE_UTC | orjson.OPT_PASSTHROUGH_DATETIME,
-                        default=datetime.isoformat,
-                    ),
-                )
+
+async def handle_agent_message(ws, remote, lobby, message):
+    """Dispatches a single parsed MessageToServer from a client."""
+    if message.type == message_to_server.MessageType.GOOGLE_AUTH:
+        await google_authenticator.handle_auth(ws, message.google_auth)
+        return
+
+    if message.type == message_to_server.MessageType.USER_INFO:
+        await user_info_fetcher.handle_userinfo_request(ws, remote)
+        return
+
+    if message.type == message_to_server.MessageType.ROOM_MANAGEMENT:
+        lobby.handle_request(message, ws)
+        return
+
+    if message.type == message_to_server.MessageType.CLIENT_EXCEPTION:
+        logger.info(
+            f"========== @@@@@@@@@ ############ $$$$$$$$$$$ Client exception: {message.client_exception}"
+        )
+        client_exception_logger.queue_exception(message.client_exception)
+        return
+
+    if message.type == message_to_server.MessageType.PONG:
+        # Calculate the time offset.
+        t0 = remote.last_ping.replace(tzinfo=timezone.utc)
+        t1 = parser.isoparse(message.pong.ping_receive_time).replace(
+            tzinfo=timezone.utc
+        )
+        t2 = message.transmit_time.replace(tzinfo=timezone.utc)
+        t3 = datetime.utcnow().replace(tzinfo=timezone.utc)
+        # Calculate clock offset and latency.
+        remote.time_offset = ((t1 - t0).total_seconds() + (t2 - t3).total_seconds()) / 2
+        remote.latency = ((t3 - t0).total_seconds() - (t2 - t1).total_seconds()) / 2
+        return
+
+    if lobby.socket_in_room(ws):
+        # Only handle in-game actions if we're in a room.
+        (room_id, player_id, _) = lobby.socket_info(ws).as_tuple()
+        room = lobby.get_room(room_id)
+        room.drain_messages(player_id, [message])
+    else:
+        # Room manager handles out-of-game requests.
+        lobby.handle_request(message, ws)
 
 
 async def receive_agent_updates(request, ws, lobby):
@@ -1200,63 +1249,23 @@ async def receive_agent_updates(request, ws, lobby):
         if msg.type == aiohttp.WSMsgType.ERROR:
             await ws.close()
             logger.error("ws connection closed with exception %s" % ws.exception())
-            continue
+            break
 
-        if msg.type != aiohttp.WSMsgType.TEXT:
+        if msg.type not in [aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY]:
             continue
 
         remote.last_message_up = time.time()
         remote.bytes_up += len(msg.data)
 
-        if msg.data == "close":
+        if msg.data == "close" or msg.data == b"close":
             await ws.close()
-            continue
-
-        logger.debug("Raw message: " + msg.data)
-        message = message_to_server.MessageToServer.from_json(msg.data)
-
-        if message.type == message_to_server.MessageType.GOOGLE_AUTH:
-            await google_authenticator.handle_auth(ws, message.google_auth)
-            continue
-
-        if message.type == message_to_server.MessageType.USER_INFO:
-            await user_info_fetcher.handle_userinfo_request(ws, remote)
-            continue
-
-        if message.type == message_to_server.MessageType.ROOM_MANAGEMENT:
-            lobby.handle_request(message, ws)
-            continue
-
-        if message.type == message_to_server.MessageType.CLIENT_EXCEPTION:
-            logger.info(
-                f"========== @@@@@@@@@ ############ $$$$$$$$$$$ Client exception: {message.client_exception}"
-            )
-            client_exception_logger.queue_exception(message.client_exception)
-            continue
-
-        if message.type == message_to_server.MessageType.PONG:
-            # Calculate the time offset.
-            t0 = remote.last_ping.replace(tzinfo=timezone.utc)
-            t1 = parser.isoparse(message.pong.ping_receive_time).replace(
-                tzinfo=timezone.utc
-            )
-            t2 = message.transmit_time.replace(tzinfo=timezone.utc)
-            t3 = datetime.utcnow().replace(tzinfo=timezone.utc)
-            # Calculate clock offset and latency.
-            remote.time_offset = (
-                (t1 - t0).total_seconds() + (t2 - t3).total_seconds()
-            ) / 2
-            remote.latency = ((t3 - t0).total_seconds() - (t2 - t1).total_seconds()) / 2
-            continue
+            break
 
-        if lobby.socket_in_room(ws):
-            # Only handle in-game actions if we're in a room.
-            (room_id, player_id, _) = lobby.socket_info(ws).as_tuple()
-            room = lobby.get_room(room_id)
-            room.drain_messages(player_id, [message])
-        else:
-            # Room manager handles out-of-game requests.
-            lobby.handle_request(message, ws)
+        logger.debug("Raw message: %s", msg.data)
+        # The python client sends UTF-8 JSON as binary frames. These are
+        # parsed directly from bytes, skipping a str allocation.
+        for message in message_to_server.MessageToServer.list_from_frame(msg.data):
+            await handle_agent_message(ws, remote, lobby, message)
 
 
 @routes.get("/player_endpoint")
@@ -1312,6 +1321,9 @@ async def PlayerEndpoint(request):
     if is_bot:
         remote = dataclasses.replace(remote, user_type=UserType.BOT)
 
+    if request.query.get("batch", "") == "true":
+        remote = dataclasses.replace(remote, batch_messages=True)
+
     if is_mturk:
         remote = dataclasses.replace(
             remote, mturk_id=worker_id, user_type=UserType.MTURK
@@ -1320,12 +1332,22 @@ async def PlayerEndpoint(request):
     AddRemote(ws, remote, assignment)
     logger.info(f"Player connected. Type: {repr(remote.user_type)}")
     LogConnectionEvent(remote, "Connected to Server.")
+    # Receive on the handler's own task, so each connection only needs one
+    # extra task for streaming. Both loops end once the socket is closed, so
+    # if streaming stops first (e.g. by raising), close the socket to end
+    # receiving too.
+    stream_task = asyncio.create_task(stream_game_state(request, ws, lobby))
+    stream_task.add_done_callback(
+        lambda task: task.cancelled() or asyncio.ensure_future(ws.close())
+    )
     try:
-        await asyncio.gather(
-            receive_agent_updates(request, ws, lobby),
-            stream_game_state(request, ws, lobby),
-        )
+        await receive_agent_updates(request, ws, lobby)
+        if stream_task.done():
+            # Re-raises the streaming error, if that's what ended the connection.
+            stream_task.result()
     finally:
+        stream_task.cancel()
+        await ws.close()
         logger.info("=====================================")
         logger.info("player disconnected from : " + request.remote)
         LogConnectionEvent(remote, "Disconnected from Server.")
@@ -1338,16 +1360,35 @@ def HashCollectAssets(assets_directory):
     assets_map = {}
     assets_directory.mkdir(parents=False, exist_ok=True)
     for item in os.listdir(assets_directory):
-        assets_map[hashlib.md5(item.encode()).hexdigest()] = os.path.join(
-            assets_directory, item
-        )
+        # 16-byte blake2b keeps the same 32-character hex IDs as md5 did.
+        asset_id = hashlib.blake2b(os.fsencode(item), digest_size=16).hexdigest()
+        assets_map[asset_id] = os.path.join(assets_directory, item)
     return assets_map
 
 
-# A dictionary from md5sum to asset filename.
+def AssetResponseHeaders(assets_map):
+    """Precomputes ETag and caching headers for each asset, keyed by asset ID.
+
+    The ETag is derived from the file's mtime and size at startup (the same
+    scheme aiohttp's FileResponse uses), so revalidation requests can be
+    answered without touching the filesystem.
+    """
+    headers = {}
+    for asset_id, path in assets_map.items():
+        stat = os.stat(path)
+        headers[asset_id] = {
+            "ETag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            "Cache-Control": f"public, max-age={ASSET_CACHE_MAX_AGE_S}",
+        }
+    return headers
+
+
+# A dictionary from filename hash to asset filename.
 assets_map = {}
+# A dictionary from filename hash to precomputed response headers.
+asset_headers = {}
 
-# Serves assets obfuscated by md5suming the filename.
+# Serves assets obfuscated by hashing the filename.
 # This is used to prevent asset discovery.
 
 
@@ -1356,7 +1397,13 @@ async def asset(request):
     asset_id = request.match_info.get("asset_id", "")
     if asset_id not in assets_map:
         raise aiohttp.web.HTTPNotFound("/redirect")
-    return web.FileResponse(assets_map[asset_id])
+    headers = asset_headers.get(asset_id, None)
+    if headers is None:
+        return web.FileResponse(assets_map[asset_id])
+    if_none_match = request.headers.get("If-None-Match", "")
+    if headers["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return web.Response(status=304, headers=headers)
+    return web.FileResponse(assets_map[asset_id], headers=headers)
 
 
 async def serve(config):
@@ -1398,6 +1445,17 @@ def InitPythonLogging():
     - Exception stack traces."""
     log_format = "[%(asctime)s] %(name)s %(levelname)s [%(module)s:%(funcName)s:%(lineno)d] %(message)s"
     logging.basicConfig(level=logging.INFO, format=log_format)
+    # Hand records to a background thread, which runs the actual handlers. This
+    # keeps log I/O from blocking the event loop.
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(
+        log_queue, *root_logger.handlers, respect_handler_level=True
+    )
+    root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    log_listener.start()
+    # Flushes queued records on shutdown.
+    atexit.register(log_listener.stop)
     logging.getLogger("asyncio").setLevel(logging.INFO)
     logging.getLogger("peewee").setLevel(logging.INFO)
     # Disable pdoc warnings.
@@ -1477,8 +1535,14 @@ def CreateExceptionDirectory(config):
 
 def main(config_filepath="server/config/server-config.yaml"):
     global assets_map
+    global asset_headers
     global lobby
 
+    if uvloop is not None:
+        # Must happen before any coroutines are scheduled below, so that they
+        # all run on a uvloop event loop.
+        uvloop.install()
+
     # On exit, deletes temporary download files.
     atexit.register(CleanupDownloadFiles)
     atexit.register(SaveClientExceptionsToDB)
@@ -1506,6 +1570,7 @@ def main(config_filepath="server/config/server-config.yaml"):
         lobby_coroutines.append(lobby.cleanup_rooms())
 
     assets_map = HashCollectAssets(GlobalConfig().assets_directory())
+    asset_headers = AssetResponseHeaders(assets_map)
     logger.info(f"WARNING: ")
     tasks = asyncio.gather(
         *lobby_coroutines,
@@ -1515,6 +1580,7 @@ def main(config_filepath="server/config/server-config.yaml"):
         ExceptionSaver(lobbies, GlobalConfig()),
     )
     loop = asyncio.get_event_loop()
+    logger.info(f"Event loop: {type(loop).__module__}.{type(loop).__name__}")
     # loop.set_debug(enabled=True)
     try:
         loop.run_until_complete(tasks)
@@ -877,6 +877,8 @@ class MapProvider(object):
         self._cols = map_update.cols
         self._cards = cards
         self._selected_cards = {}
+        # Cached result of selected_cards_collide(). None if stale.
+        self._selected_cards_collide = None
         self._card_generator = CardGenerator(self._id_assigner)
 
         # Get fog from server config.
@@ -951,6 +953,7 @@ class MapProvider(object):
         self._cols = map_update.cols
         self._cards = []
         self._selected_cards = {}
+        self._selected_cards_collide = None
         self._card_generator = CardGenerator(self._id_assigner)
 
         # Initialize fog from server config.
@@ -1107,6 +1110,7 @@ class MapProvider(object):
         return self._cards
 
     def set_selected(self, card_id, selected):
+        self._selected_cards_collide = None
         for idx, card in enumerate(self._cards):
             if card.id == card_id:
                 self._cards[idx].selected = selected
@@ -1165,10 +1169,13 @@ class MapProvider(object):
         return self._spawn_points
 
     def consume_spawn_point(self) -> HecsCoord:
-        # Return a random spawn point.
-        if len(self._spawn_points) == 0:
+        # Return a random spawn point. Swap it to the end so the pop is O(1).
+        spawn_points = self._spawn_points
+        if len(spawn_points) == 0:
             return None
-        return self._spawn_points.pop(np.random.randint(len(self._spawn_points)))
+        i = np.random.randint(len(spawn_points))
+        spawn_points[i], spawn_points[-1] = spawn_points[-1], spawn_points[i]
+        return spawn_points.pop()
 
     def release_spawn_point(self, coord: HecsCoord):
         self._spawn_points.append(coord)
@@ -1177,6 +1184,12 @@ class MapProvider(object):
         return self._selected_cards.values()
 
     def selected_cards_collide(self):
+        # Checked every game loop iteration, but only changes on card selection.
+        if self._selected_cards_collide is None:
+            self._selected_cards_collide = self._compute_selected_cards_collide()
+        return self._selected_cards_collide
+
+    def _compute_selected_cards_collide(self):
         shapes = set()
         colors = set()
         counts = set()
@@ -1273,5 +1286,5 @@ async def MapGenerationTask(lobbies, config):
         # Add a map to the map cache.
         map_pool.append(MapProvider(MapType.RANDOM))
         if len(map_pool) % 10 == 0:
-            print(f"Map pool size: {len(map_pool)}")
+            logger.info(f"Map pool size: {len(map_pool)}")
         await asyncio.sleep(0.001)
@@ -259,17 +259,31 @@ def asset_id_to_icon(asset_id):
         return ""
 
 
-def draw_wrapped(display, instruction_text, max_width=50):
-    words = instruction_text.split(" ")
+def wrap_text(text, max_width=50):
+    """Splits text on spaces into lines of at most max_width characters.
+
+    Words longer than max_width are placed on a line of their own.
+    """
     lines = []
-    current_line = ""
-    for word in words:
-        if len(current_line) + len(word) > max_width:
-            lines.append(current_line)
-            current_line = word
+    current_line = []
+    width = 0
+    for word in text.split(" "):
+        if current_line and width + len(word) + 1 > max_width:
+            lines.append(" ".join(current_line))
+            current_line = [word]
+            width = len(word)
+        elif current_line:
+            current_line.append(word)
+            width += len(word) + 1
         else:
-            current_line += " " + word
-    lines.append(current_line)
+            current_line = [word]
+            width = len(word)
+    lines.append(" ".join(current_line))
+    return lines
+
+
+def draw_wrapped(display, instruction_text, max_width=50):
+    lines = wrap_text(instruction_text, max_width)
     screen_size = display._screen_size
     for i, line in enumerate(lines):
         (line_text, _) = INSTRUCTION_FONT.render(line, pygame.Color(90, 90, 90))
@@ -57,7 +57,7 @@ def CensorActionForFollower(action, follower):
     """
     if action.border_color == Color(1, 0, 0, 1):
         action = replace(action, border_color=Color(0, 0, 1, 1))
-        logger.debug(f"Censored action {action} for follower {follower}")
+        logger.debug("Censored action %s for follower %s", action, follower)
     return action
 
 
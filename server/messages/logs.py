@@ -26,6 +26,23 @@ def LogEntryFromOutgoingMessage(player_id, message_from_server):
     return LogEntry(Direction.FROM_SERVER, player_id, message_from_server, None)
 
 
+def EncodedLogEntryFromOutgoingMessage(player_id, message_bytes: bytes) -> bytes:
+    """JSON-encoded LogEntryFromOutgoingMessage, built from an encoded message.
+
+    Produces the same bytes as orjson-encoding the LogEntry, but reuses the
+    already-serialized message instead of encoding it a second time. Must be
+    kept in sync with the LogEntry field order.
+    """
+    return b"".join(
+        [
+            b'{"message_direction":%d,"player_id":%d,"message_from_server":'
+            % (Direction.FROM_SERVER.value, player_id),
+            message_bytes,
+            b',"message_to_server":null}',
+        ]
+    )
+
+
 @dataclass(frozen=True)
 class LogEntry(DataClassJSONMixin):
     message_direction: Direction
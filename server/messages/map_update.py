@@ -14,10 +14,22 @@ logger = logging.getLogger(__name__)
 
 @dataclass(frozen=True)
 class Tile(DataClassJSONMixin):
+    # Maps have thousands of tiles. Slots avoid a per-tile __dict__.
+    __slots__ = ("asset_id", "cell", "rotation_degrees")
     asset_id: int
     cell: HexCell
     rotation_degrees: int
 
+    # copy & pickle restore slots with setattr(), which a frozen dataclass
+    # rejects. Provide state explicitly so deepcopy (used when censoring
+    # maps for the follower) keeps working.
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
 
 @dataclass
 class City(DataClassJSONMixin):
@@ -6,6 +6,7 @@ from enum import Enum
 from typing import List, Optional
 
 import dateutil.parser
+import orjson
 from dataclasses_json import config
 from marshmallow import fields
 from mashumaro.mixins.json import DataClassJSONMixin
@@ -27,6 +28,9 @@ from server.messages.turn_state import TurnState
 from server.messages.tutorials import TutorialResponse
 from server.messages.user_info import UserInfo
 
+# orjson settings used to encode messages sent to clients.
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_PASSTHROUGH_DATETIME
+
 
 class MessageType(Enum):
     ACTIONS = 0
@@ -479,3 +483,72 @@ class MessageFromServer(DataClassJSONMixin):
     feedback_question: Optional[FeedbackQuestion] = field(
         default=None, metadata=config(exclude=ExcludeIfNone)
     )
+
+    def to_bytes(self) -> bytes:
+        """Encodes this message as JSON with orjson, the format sent to clients."""
+        return orjson.dumps(self, option=ORJSON_OPTIONS, default=datetime.isoformat)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Parses a message from its JSON encoding (bytes or str).
+
+        Uses orjson instead of the stdlib json parser in from_json(). Message
+        types received every tick are constructed directly by decoding only
+        their populated field. Other types fall back to from_dict().
+        """
+        message_dict = orjson.loads(data)
+        message_type = MessageType(message_dict["type"])
+        if message_type not in _FIELD_DECODERS:
+            return cls.from_dict(message_dict)
+        field_name, decode = _FIELD_DECODERS[message_type]
+        transmit_time = datetime.fromisoformat(message_dict["transmit_time"])
+        if field_name is None:
+            return cls(transmit_time, message_type)
+        value = message_dict.get(field_name, None)
+        if value is not None:
+            value = decode(value)
+        return cls(transmit_time, message_type, **{field_name: value})
+
+
+def ReplaceTransmitTime(message_bytes: bytes, transmit_time: datetime) -> bytes:
+    """Re-stamps an encoded MessageFromServer (see to_bytes()) with a new transmit_time.
+
+    transmit_time is the first field, so the rest of the encoding is reused
+    as-is. Avoids re-encoding large messages which are resent unchanged.
+    """
+    fields_start = message_bytes.index(b',"type":')
+    return b"".join(
+        [
+            b'{"transmit_time":',
+            orjson.dumps(transmit_time.isoformat()),
+            message_bytes[fields_start:],
+        ]
+    )
+
+
+# Maps from MessageType -> (populated field name, decoder for that field).
+# Used by MessageFromServer.from_bytes() for the most frequent message types.
+_FIELD_DECODERS = {
+    MessageType.ACTIONS: (
+        "actions",
+        lambda actions: [Action.from_dict(action) for action in actions],
+    ),
+    MessageType.MAP_UPDATE: ("map_update", MapUpdate.from_dict),
+    MessageType.STATE_SYNC: ("state", StateSync.from_dict),
+    MessageType.OBJECTIVE: (
+        "objectives",
+        lambda objectives: [
+            ObjectiveMessage.from_dict(objective) for objective in objectives
+        ],
+    ),
+    MessageType.GAME_STATE: ("turn_state", TurnState.from_dict),
+    MessageType.PING: (None, None),
+    MessageType.LIVE_FEEDBACK: ("live_feedback", LiveFeedback.from_dict),
+    MessageType.PROP_UPDATE: ("prop_update", PropUpdate.from_dict),
+    # Ticks are the most frequent message and have a single field, so skip the
+    # generic from_dict() machinery.
+    MessageType.STATE_MACHINE_TICK: (
+        "state_machine_tick",
+        lambda tick: StateMachineTick(iter=tick.get("iter", -1)),
+    ),
+}
@@ -5,6 +5,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
+import orjson
 from mashumaro import pass_through
 from mashumaro.mixins.json import DataClassJSONMixin
 
@@ -61,3 +62,22 @@ class MessageToServer(DataClassJSONMixin):
     replay_request: Optional[ReplayRequest] = None
     scenario_request: Optional[ScenarioRequest] = None
     client_exception: Optional[ClientException] = None
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Parses a message from its JSON encoding (bytes or str).
+
+        Uses orjson instead of the stdlib json parser in from_json().
+        """
+        return cls.from_dict(orjson.loads(data))
+
+    @classmethod
+    def list_from_frame(cls, data):
+        """Parses every message in a websocket frame (bytes or str).
+
+        Clients may batch several messages into one frame, separated by
+        newlines (see py_client/remote_client.py). Serialized JSON never
+        contains a raw newline, so this is safe for single messages too.
+        """
+        newline = "\n" if isinstance(data, str) else b"\n"
+        return [cls.from_bytes(line) for line in data.split(newline) if len(line) > 0]
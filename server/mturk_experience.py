@@ -56,7 +56,7 @@ def UpdateLeaderExperience(game_record):
     leader_experience = GetOrCreateWorkerExperienceEntry(game_record.leader.hashed_id)
     if leader_experience is None:
         return
-    print(f"Leader EXP ID: {leader_experience.id}")
+    logger.info(f"Leader EXP ID: {leader_experience.id}")
     update_leader_stats(leader_experience, game_record)
 
 
@@ -69,7 +69,7 @@ def UpdateFollowerExperience(game_record):
     )
     if follower_experience is None:
         return
-    print(f"Follower EXP ID: {follower_experience.id}")
+    logger.info(f"Follower EXP ID: {follower_experience.id}")
     update_follower_stats(follower_experience, game_record)
 
 
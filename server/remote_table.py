@@ -47,7 +47,8 @@ def GetRemoteTable():
 
 
 def DeleteRemote(web_socket_response):
-    del remote_table[web_socket_response]
+    remote_table.pop(web_socket_response, None)
+    remote_worker_table.pop(web_socket_response, None)
 
 
 def LogConnectionEvent(remote, event_str):
@@ -85,6 +86,9 @@ class Remote:
     time_offset: float = 0.0
     latency: float = 0.0
     uuid: str = ""
+    # If true, the client accepts several newline-separated messages in one
+    # websocket frame. Set by connecting with the batch=true query parameter.
+    batch_messages: bool = False
 
     def __str__(self):
         return f"m5sum hashed ip: {self.hashed_ip}, bytes (up/down): {self.bytes_up}/{self.bytes_down}, last message (up/down): {self.last_message_up}/{self.last_message_down}, time_offset: {self.time_offset}, latency: {self.latency}"
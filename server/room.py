@@ -14,9 +14,10 @@ import server.schemas.mturk as mturk_db
 from server.config.config import GlobalConfig
 from server.lobby_consts import IsGoogleLobby, IsMturkLobby
 from server.messages.logs import (
+    EncodedLogEntryFromOutgoingMessage,
     LogEntryFromIncomingMessage,
-    LogEntryFromOutgoingMessage,
 )
+from server.messages import message_from_server
 from server.messages.rooms import Role
 from server.messages.scenario import Scenario
 from server.messages.tutorials import RoleFromTutorialName
@@ -31,6 +32,16 @@ from server.tutorial_state import TutorialGameState
 
 logger = logging.getLogger(__name__)
 
+# Full-state messages that are often sent unchanged to several players, mapped
+# to the field holding their payload. See Room._encode_message().
+REUSED_ENCODING_FIELDS = {
+    message_from_server.MessageType.MAP_UPDATE: "map_update",
+    message_from_server.MessageType.PROP_UPDATE: "prop_update",
+}
+# Encodings kept per message type: one for the leader's and one for the
+# follower's view.
+REUSED_ENCODINGS_PER_TYPE = 2
+
 
 class RoomType(Enum):
     NONE = 0
@@ -112,6 +123,9 @@ class Room(object):
         if self._room_type not in [RoomType.PRESET_GAME, RoomType.REPLAY]:
             self._game_record.save()
         self._update_loop = None
+        # MessageType -> (payload, encoded message) for the last full-state
+        # message of each type in REUSED_ENCODING_FIELDS sent from this room.
+        self._last_encodings = {}
         if self._room_type == RoomType.PRESET_GAME:
             # Create a dummy log directory for the game that ignores all writes.
             self._log_directory = pathlib.Path("/dev/null")
@@ -250,7 +264,7 @@ class Room(object):
                 default=datetime.isoformat,
             ).decode("utf-8")
             self._messages_to_server_log.write(log_message + "\n")
-            logger.info(f"Received message type {message.type} for player {id}.")
+            logger.info("Received message type %s for player %s.", message.type, id)
 
     def start(self):
         if self._update_loop is not None:
@@ -332,31 +346,62 @@ class Room(object):
         }
 
     def fill_messages(self, player_id, out_messages):
-        """Returns a MessageFromServer object to send to the indicated player.
+        """Fills out_messages with encoded messages for the indicated player.
+
+        Messages are JSON bytes, ready to transmit. Each MessageFromServer is
+        encoded once, and the same bytes are written to the game's message log.
 
-        If no message is available, returns None.
+        Returns False if no messages are available.
         """
         messages = []
         if not self._state_machine_driver.fill_messages(player_id, messages):
             return False
-        out_messages.extend(messages)
 
         for message in messages:
             try:
-                log_bytes = orjson.dumps(
-                    LogEntryFromOutgoingMessage(player_id, message),
-                    option=orjson.OPT_NAIVE_UTC | orjson.OPT_PASSTHROUGH_DATETIME,
-                    default=datetime.isoformat,
-                ).decode("utf-8")
-                self._messages_from_server_log.write(log_bytes + "\n")
+                message_bytes = self._encode_message(message)
             except TypeError:
                 logger.info(f"Error with message {message}")
                 while True:
                     import sys
 
                     sys.exit(1)
+            out_messages.append(message_bytes)
+            log_bytes = EncodedLogEntryFromOutgoingMessage(player_id, message_bytes)
+            self._messages_from_server_log.write(log_bytes.decode("utf-8") + "\n")
         return True
 
+    def _encode_message(self, message):
+        """Encodes a message, reusing encodings of unchanged full-state messages.
+
+        Map and prop updates are large, and the same update is sent to every
+        player (and resent on role switches and resyncs). Payloads are compared
+        by identity; the state machine builds a new update object when the map
+        or cards change, and keeps the follower's censored map alongside it.
+        """
+        field_name = REUSED_ENCODING_FIELDS.get(message.type, None)
+        if field_name is None:
+            return message.to_bytes()
+        payload = getattr(message, field_name)
+        encodings = self._last_encodings.setdefault(message.type, [])
+        if payload is not None:
+            for last_payload, last_bytes in encodings:
+                if payload is last_payload:
+                    return message_from_server.ReplaceTransmitTime(
+                        last_bytes, message.transmit_time
+                    )
+        message_bytes = message.to_bytes()
+        encodings.append((payload, message_bytes))
+        del encodings[:-REUSED_ENCODINGS_PER_TYPE]
+        return message_bytes
+
+    async def wait_for_messages(self, player_id, timeout):
+        """Waits up to timeout seconds for messages for the indicated player.
+
+        Returns True if fill_messages() has messages to return.
+        """
+        return await self._state_machine_driver.wait_for_messages(player_id, timeout)
+
     def id(self):
         """Returns the room id."""
         return self._id
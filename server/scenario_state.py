@@ -77,7 +77,7 @@ class ScenarioState(object):
         self._state._map_provider = MapProvider(
             MapType.PRESET, DefaultMap(), []
         )  # pylint: disable=protected-access
-        self._state._map_update = (
+        self._state._set_map_update(
             self._state._map_provider.map()
         )  # pylint: disable=protected-access
         self._state._prop_update = (
@@ -1,4 +1,5 @@
 import logging
+import pathlib
 
 from peewee import Model
 from playhouse.sqlite_ext import SqliteExtDatabase
@@ -39,6 +40,28 @@ def SetDataConfig(data_config):
     )
 
 
+def SetDatabaseReadOnly(config):
+    """Opens the config's database read-only, tuned for bulk analysis scans.
+
+    Pages are memory-mapped (up to 1GB) and served from a 64MB page cache.
+    The database is opened with mode=ro and query_only, so analysis tools can't
+    modify it even while the server is running.
+    """
+    # as_uri() percent-encodes characters like "?" and "#", which would
+    # otherwise be parsed as part of the URI.
+    database_uri = pathlib.Path(config.database_path()).resolve().as_uri()
+    database.init(
+        f"{database_uri}?mode=ro",
+        uri=True,
+        pragmas=[
+            ("query_only", 1),
+            ("mmap_size", 1 << 30),  # 1GB
+            ("cache_size", -1024 * 64),  # 64MB
+            ("temp_store", "memory"),
+        ],
+    )
+
+
 def SetDatabaseForTesting():
     database.init(":memory:")
 
@@ -1,11 +1,9 @@
 import dataclasses
 import logging
-import math
-import queue
+import time
 import uuid
 from collections import deque
 from datetime import datetime, timedelta
-from queue import Queue
 from typing import List
 
 import humanhash
@@ -43,6 +41,7 @@ from server.state_utils import (
     FOLLOWER_TURN_END_DELAY_SECONDS,
     LEADER_MOVES_PER_TURN,
     LEADER_SECONDS_PER_TURN,
+    MAX_TRANSLATION_DISTANCE_SQUARED,
     turn_reward,
 )
 from server.username_word_list import USERNAME_WORDLIST
@@ -167,7 +166,7 @@ class State(object):
 
         self._synced = {}
         self._action_history = {}
-        self._turn_history = {}
+        self._pending_turn_state = {}  # Maps from player_id -> latest TurnState.
 
         self._scenario_download_pending = (
             {}
@@ -179,6 +178,10 @@ class State(object):
         self._last_card_step_actor = None
 
         self._turn_state = None
+        # _turn_state.turn_end on the monotonic clock, for expiry checks that
+        # aren't thrown off by wall clock adjustments. Only set when a turn
+        # starts, so that later turn state updates can't re-anchor it.
+        self._turn_end_monotonic = None
 
         # We need to add a delay to the end of the follower's turn. So instead of ending the
         # turn immediately, we start the follower turn delay timer. When the timer reachers
@@ -201,11 +204,13 @@ class State(object):
             # Map props and actors share IDs from the same pool, so the ID assigner
             # is shared to prevent overlap.
             self._map_provider = CachedMapRetrieval()
+            turn_duration = State.turn_duration(Role.LEADER)
+            self._turn_end_monotonic = time.monotonic() + turn_duration.total_seconds()
             initial_turn = TurnUpdate(
                 Role.LEADER,
                 LEADER_MOVES_PER_TURN,
                 6,
-                datetime.utcnow() + State.turn_duration(Role.LEADER),
+                datetime.utcnow() + turn_duration,
                 datetime.utcnow(),
                 0,
                 0,
@@ -213,7 +218,7 @@ class State(object):
             )
             self._send_turn_state(initial_turn)
 
-        self._map_update = self._map_provider.map()
+        self._set_map_update(self._map_provider.map())
         # Maps from player_id -> list of props to update.
         self._prop_update = self._map_provider.prop_update()
 
@@ -250,10 +255,10 @@ class State(object):
 
     def _announce_action(self, action):
         # Marks an action as validated (i.e. it did not conflict with other actions).
-        # Queues this action to be sent to each user.
-        for id in self._actors:
-            actor = self._actors[id]
-            self._action_history[actor.actor_id()].append(action)
+        # Queues this action to be sent to each user. Each actor has an entry in
+        # _action_history for as long as it's in the game.
+        for action_history in self._action_history.values():
+            action_history.append(action)
 
     def mark_player_disconnected(self, id):
         if id not in self._role_history:
@@ -335,14 +340,13 @@ class State(object):
             logger.debug(f"New actors added.")
             send_tick = True
 
-        if datetime.utcnow() >= self._turn_state.turn_end:
+        if self._turn_expired():
             self._update_turn(end_reason="RanOutOfTime")
             logger.debug(f"Turn timed out.")
             send_tick = True
 
         # Handle actor actions.
-        for actor_id in self._actors:
-            actor = self._actors[actor_id]
+        for actor_id, actor in self._actors.items():
             while actor.has_actions():
                 proposed_action = actor.peek()
                 if not self._turn_state.turn == actor.role():
@@ -443,8 +447,7 @@ class State(object):
 
         while len(self._live_feedback_queue) > 0:
             (id, feedback) = self._live_feedback_queue.popleft()
-            for actor_id in self._actors:
-                self._live_feedback[actor_id] = feedback.signal
+            self._live_feedback.update(dict.fromkeys(self._actors, feedback.signal))
             send_tick = True
             active_instruction = None
             if len(self._instructions) > 0:
@@ -502,9 +505,9 @@ class State(object):
                 self._announce_action(card_select_action)
                 # Find the actor that selected this card.
                 stepping_actor = None
-                for actor_id in self._actors:
-                    if self._actors[actor_id].location() == card.location:
-                        stepping_actor = self._actors[actor_id]
+                for actor in self._actors.values():
+                    if actor.location() == card.location:
+                        stepping_actor = actor
                         break
                 self._game_recorder.record_card_selection(stepping_actor, card)
             self.queue_leader_sound(SoundClipType.INVALID_SET)
@@ -582,8 +585,7 @@ class State(object):
             self._prop_update = self._map_provider.prop_update()
             self._prop_update = map_utils.CensorCards(self._prop_update, None)
             self._send_state_machine_info = True
-            for actor_id in self._actors:
-                self._prop_stale[actor_id] = True
+            self._prop_stale.update(dict.fromkeys(self._actors, True))
 
         # Check to see if the game is over.
         if self._turn_state.turns_left <= -1:
@@ -633,13 +635,14 @@ class State(object):
 
         Limits to determinism:
         If some events happen during the same state machine poll period, they
-        will get put into the same tick. The poll period is roughly 2ms (though
-        you should measure this directly, as it will change depending on server
-        resources availability and CB2 software version). Since arrival time of
+        will get put into the same tick. The loop runs when messages arrive, and
+        otherwise at least every 10ms (see IDLE_POLL_PERIOD_S in
+        server/state_machine_driver.py; measure this directly, as it will change
+        depending on server resources availability). Since arrival time of
         events depends on the timing of external factors (network messages,
         etc), it results in slightly
         nondeterministic behavior.  For example, an actor joining usually gets
-        its own tick, but if two actors join simultaneously (within ~2ms) they
+        its own tick, but if two actors join simultaneously (within ~10ms) they
         will both happen on the same tick. This means that the tick count can't
         always be relied upon to be deterministically the same, given the same
         events occurring (unless those events themselves are deterministic, like
@@ -670,12 +673,11 @@ class State(object):
     def _update_turn(self, force_role_switch=False, end_reason=""):
         if self._turn_state.turn == Role.PAUSED:
             return
+        now = datetime.utcnow()
         opposite_role = (
             Role.LEADER if self._turn_state.turn == Role.FOLLOWER else Role.FOLLOWER
         )
-        role_switch = (
-            datetime.utcnow() >= self._turn_state.turn_end
-        ) or force_role_switch
+        role_switch = self._turn_expired() or force_role_switch
         next_role = self._turn_state.turn
         if role_switch:
             if (
@@ -686,7 +688,7 @@ class State(object):
                 for question in FOLLOWER_FEEDBACK_QUESTIONS:
                     question.uuid = uuid.uuid4()
                     question.transmit_time_s = (
-                        datetime.utcnow() - self._turn_state.game_start
+                        now - self._turn_state.game_start
                     ).total_seconds()
                     self._feedback_questions[self._follower.actor_id()].append(question)
                     self._unanswered_feedback_question[
@@ -713,12 +715,13 @@ class State(object):
         if role_switch:
             # This is a mitigation to the invisible cards glitch. Update cards on role switches.
             self._prop_update = self._map_provider.prop_update()
-            for actor_id in self._actors:
-                self._prop_stale[actor_id] = True
+            self._prop_stale.update(dict.fromkeys(self._actors, True))
             self._prop_update = map_utils.CensorCards(self._prop_update, None)
             end_of_turn = next_role == Role.LEADER
             moves_remaining = self._moves_per_turn(next_role)
-            turn_end = datetime.utcnow() + State.turn_duration(next_role)
+            turn_duration = State.turn_duration(next_role)
+            turn_end = now + turn_duration
+            self._turn_end_monotonic = time.monotonic() + turn_duration.total_seconds()
             if end_of_turn:
                 turns_left -= 1
                 turn_number += 1
@@ -760,12 +763,13 @@ class State(object):
         return list(self._map_provider.selected_cards())
 
     def _check_for_stepped_on_cards(self, actor_id, action, color):
+        # Only moving onto a card can select it.
+        if action.action_type != ActionType.TRANSLATE:
+            return
         actor = self._actors[actor_id]
         stepped_on_card = self._map_provider.card_by_location(actor.location())
         # If the actor just moved and stepped on a card, mark it as selected.
-        if (action.action_type == ActionType.TRANSLATE) and (
-            stepped_on_card is not None
-        ):
+        if stepped_on_card is not None:
             logger.debug(
                 f"Player {actor.actor_id()} stepped on card {str(stepped_on_card)}."
             )
@@ -790,27 +794,31 @@ class State(object):
 
     def _drain_message(self, id, message):
         if message.type == message_to_server.MessageType.ACTIONS:
-            logger.debug(f"Actions received. Room: {self._room_id}")
+            logger.debug("Actions received. Room: %s", self._room_id)
             self._drain_actions(id, message.actions)
         elif message.type == message_to_server.MessageType.OBJECTIVE:
             logger.debug(
-                f"Objective received. Room: {self._room_id}, Text: {message.objective.text}"
+                "Objective received. Room: %s, Text: %s",
+                self._room_id,
+                message.objective.text,
             )
             self._drain_instruction(id, message.objective)
         elif message.type == message_to_server.MessageType.OBJECTIVE_COMPLETED:
             logger.debug(
-                f"Objective Compl received. Room: {self._room_id}, uuid: {message.objective_complete.uuid}"
+                "Objective Compl received. Room: %s, uuid: %s",
+                self._room_id,
+                message.objective_complete.uuid,
             )
             self._drain_instruction_complete(id, message.objective_complete)
             self._log_instructions()
         elif message.type == message_to_server.MessageType.TURN_COMPLETE:
-            logger.debug(f"Turn Complete received. Room: {self._room_id}")
+            logger.debug("Turn Complete received. Room: %s", self._room_id)
             self._drain_turn_complete(id, message.turn_complete)
         elif message.type == message_to_server.MessageType.STATE_SYNC_REQUEST:
-            logger.debug(f"Sync request recvd. Room: {self._room_id}, Player: {id}")
+            logger.debug("Sync request recvd. Room: %s, Player: %s", self._room_id, id)
             self.desync(id)
         elif message.type == message_to_server.MessageType.LIVE_FEEDBACK:
-            logger.debug(f"Live feedback recvd. Room: {self._room_id}, Player: {id}")
+            logger.debug("Live feedback recvd. Room: %s, Player: %s", self._room_id, id)
             self._drain_live_feedback(id, message.live_feedback)
         elif message.type == message_to_server.MessageType.CANCEL_PENDING_OBJECTIVES:
             logger.debug(
@@ -840,7 +848,7 @@ class State(object):
 
     def _drain_actions(self, id, actions):
         for action in actions:
-            logger.debug(f"{action.id}:{action.displacement}")
+            logger.debug("%s:%s", action.id, action.displacement)
             self._drain_action(id, action)
 
     def _drain_action(self, actor_id, action):
@@ -864,8 +872,7 @@ class State(object):
             self.queue_follower_sound(SoundClipType.INSTRUCTION_RECEIVED)
         self._instructions.append(objective)
         self._instruction_added = True
-        for actor_id in self._actors:
-            self._instructions_stale[actor_id] = True
+        self._instructions_stale.update(dict.fromkeys(self._actors, True))
         self.queue_leader_sound(SoundClipType.INSTRUCTION_SENT)
 
     def queue_leader_sound(self, clip_id: SoundClipType):
@@ -980,8 +987,7 @@ class State(object):
             self._game_recorder.record_instruction_cancelled(instruction)
             self._instruction_history.append(instruction)
 
-        for actor_id in self._actors:
-            self._instructions_stale[actor_id] = True
+        self._instructions_stale.update(dict.fromkeys(self._actors, True))
 
     def create_actor(self, role):
         if role in self._preloaded_actors:
@@ -994,8 +1000,7 @@ class State(object):
             del self._preloaded_actors[role]
             self._actors[actor.actor_id()] = actor
             self._action_history[actor.actor_id()] = []
-            for actor_id in self._actors:
-                self._prop_stale[actor_id] = True
+            self._prop_stale.update(dict.fromkeys(self._actors, True))
             # Resend the latest turn state.
             self._resend_turn_state()
             self._mark_instructions_stale()
@@ -1033,8 +1038,7 @@ class State(object):
         return actor.actor_id()
 
     def _mark_instructions_stale(self):
-        for actor_id in self._actors:
-            self._instructions_stale[actor_id] = True
+        self._instructions_stale.update(dict.fromkeys(self._actors, True))
 
     def free_actor(self, actor_id):
         if actor_id in self._actors:
@@ -1043,8 +1047,8 @@ class State(object):
             del self._action_history[actor_id]
         if actor_id in self._instructions_stale:
             del self._instructions_stale[actor_id]
-        if actor_id in self._turn_history:
-            del self._turn_history[actor_id]
+        if actor_id in self._pending_turn_state:
+            del self._pending_turn_state[actor_id]
         # We don't free actor IDs. We'll never run out, and
         # keeping them from being re-used makes saving a history of which ID was
         # which role easier. Hence following line is commented:
@@ -1060,28 +1064,30 @@ class State(object):
         self._synced[actor_id] = False
 
     def desync_all(self):
-        for a in self._actors:
-            actor = self._actors[a]
-            self._synced[actor.actor_id()] = False
+        self._synced.update(dict.fromkeys(self._actors, False))
 
     def is_synced(self, actor_id):
         return self._synced[actor_id]
 
     def is_synced_all(self):
-        for a in self._actors:
-            if not self.synced(self._actors[a].actor_id()):
+        for actor_id in self._actors:
+            if not self.is_synced(actor_id):
                 return False
         return True
 
     def has_pending_messages(self):
+        synced = self._synced
+        action_history = self._action_history
+        instructions_stale = self._instructions_stale
+        pending_turn_state = self._pending_turn_state
         for actor_id in self._actors:
-            if not self.is_synced(actor_id):
+            if not synced[actor_id]:
                 return True
-            if len(self._action_history.get(actor_id, [])) > 0:
+            if len(action_history.get(actor_id, ())) > 0:
                 return True
-            if self._instructions_stale.get(actor_id, False):
+            if instructions_stale.get(actor_id, False):
                 return True
-            if not self._turn_history.get(actor_id, Queue()).empty():
+            if actor_id in pending_turn_state:
                 return True
         return False
 
@@ -1118,7 +1124,10 @@ class State(object):
         actions = self._next_actions(player_id)
         if len(actions) > 0:
             logger.debug(
-                f"Room {self._room_id} {len(actions)} actions for player_id {player_id}"
+                "Room %s %s actions for player_id %s",
+                self._room_id,
+                len(actions),
+                player_id,
             )
             msg = message_from_server.ActionsFromServer(actions)
             return msg
@@ -1126,24 +1135,33 @@ class State(object):
         map_update = self._next_map_update(player_id)
         if map_update is not None:
             logger.debug(
-                f"Room {self._room_id} map update {map_update} for player_id {player_id}"
+                "Room %s map update %s for player_id %s",
+                self._room_id,
+                map_update,
+                player_id,
             )
             return message_from_server.MapUpdateFromServer(map_update)
 
         prop_update = self._next_prop_update(player_id)
         if prop_update is not None:
             logger.debug(
-                f"Room {self._room_id} prop update with {len(prop_update.props)} for player_id {player_id}"
+                "Room %s prop update with %s for player_id %s",
+                self._room_id,
+                len(prop_update.props),
+                player_id,
             )
             return message_from_server.PropUpdateFromServer(prop_update)
 
         if not self.is_synced(player_id):
             state_sync = self._sync_message_for_transmission(player_id)
             logger.debug(
-                f"Room {self._room_id} state sync: {state_sync} for player_id {player_id}"
+                "Room %s state sync: %s for player_id %s",
+                self._room_id,
+                state_sync,
+                player_id,
             )
             logger.debug(
-                f"State sync with {player_id} and # {len(state_sync.actors)} actors"
+                "State sync with %s and # %s actors", player_id, len(state_sync.actors)
             )
             msg = message_from_server.StateSyncFromServer(state_sync)
             return msg
@@ -1151,7 +1169,10 @@ class State(object):
         objectives = self._next_instructions(player_id)
         if len(objectives) > 0:
             logger.debug(
-                f"Room {self._room_id} {len(objectives)} texts for player_id {player_id}"
+                "Room %s %s texts for player_id %s",
+                self._room_id,
+                len(objectives),
+                player_id,
             )
             msg = message_from_server.ObjectivesFromServer(objectives)
             return msg
@@ -1159,7 +1180,7 @@ class State(object):
         turn_state = self._next_turn_state(player_id)
         if not turn_state is None:
             logger.debug(
-                f"Room {self._room_id} ts {turn_state} for player_id {player_id}"
+                "Room %s ts %s for player_id %s", self._room_id, turn_state, player_id
             )
             msg = message_from_server.GameStateFromServer(turn_state)
             return msg
@@ -1167,7 +1188,10 @@ class State(object):
         live_feedback = self._next_live_feedback(player_id)
         if not live_feedback is None:
             logger.debug(
-                f"Room {self._room_id} live feedback {live_feedback} for player_id {player_id}"
+                "Room %s live feedback %s for player_id %s",
+                self._room_id,
+                live_feedback,
+                player_id,
             )
             msg = message_from_server.LiveFeedbackFromServer(live_feedback)
             return msg
@@ -1175,7 +1199,10 @@ class State(object):
         scenario_response = self._next_scenario_response(player_id)
         if not scenario_response is None:
             logger.debug(
-                f"Room {self._room_id} scenario response {scenario_response} for player_id {player_id}"
+                "Room %s scenario response %s for player_id %s",
+                self._room_id,
+                scenario_response,
+                player_id,
             )
             msg = message_from_server.ScenarioResponseFromServer(scenario_response)
             return msg
@@ -1183,21 +1210,29 @@ class State(object):
         feedback_question = self._next_feedback_question(player_id)
         if not feedback_question is None:
             logger.debug(
-                f"Room {self._room_id} feedback question {feedback_question} for player_id {player_id}"
+                "Room %s feedback question %s for player_id %s",
+                self._room_id,
+                feedback_question,
+                player_id,
             )
             msg = message_from_server.FeedbackQuestionFromServer(feedback_question)
             return msg
 
         tick = self._next_tick(player_id)
         if not tick is None:
-            logger.debug(f"Room {self._room_id} tick {tick} for player_id {player_id}")
+            logger.debug(
+                "Room %s tick %s for player_id %s", self._room_id, tick, player_id
+            )
             msg = message_from_server.StateMachineTickFromServer(tick)
             return msg
 
         sound_trigger = self._next_sound_trigger(player_id)
         if not sound_trigger is None:
             logger.debug(
-                f"Room {self._room_id} sound trigger {sound_trigger} for player_id {player_id}"
+                "Room %s sound trigger %s for player_id %s",
+                self._room_id,
+                sound_trigger,
+                player_id,
             )
             msg = message_from_server.SoundTriggerFromServer(sound_trigger)
             return msg
@@ -1244,6 +1279,16 @@ class State(object):
             follower_instructions.append(self._instructions[0])
         return follower_instructions
 
+    def _set_map_update(self, map_update):
+        """Replaces the map, precomputing the follower's censored view of it.
+
+        Map censorship isn't follower-specific, so the censored copy is made
+        once per map instead of on every map send to a follower. Reusing the
+        same objects also lets the room reuse their encodings.
+        """
+        self._map_update = map_update
+        self._follower_map_update = map_utils.CensorMapForFollower(map_update, None)
+
     def _next_map_update(self, actor_id):
         if not actor_id in self._map_stale:
             self._map_stale[actor_id] = True
@@ -1256,9 +1301,7 @@ class State(object):
         map_update = self._map_update
 
         if self._actors[actor_id].role() == Role.FOLLOWER:
-            map_update = map_utils.CensorMapForFollower(
-                map_update, self._actors[actor_id]
-            )
+            map_update = self._follower_map_update
 
         # Send the latest map and mark as fresh for this player.
         self._map_stale[actor_id] = False
@@ -1314,10 +1357,7 @@ class State(object):
 
     # Returns the current state of the game.
     def state(self, actor_id=-1):
-        actor_states = []
-        for a in self._actors:
-            actor = self._actors[a]
-            actor_states.append(actor.state())
+        actor_states = [actor.state() for actor in self._actors.values()]
         role = self._actors[actor_id].role() if actor_id >= 0 else Role.NONE
         return state_sync.StateSync(len(self._actors), actor_states, actor_id, role)
 
@@ -1334,10 +1374,9 @@ class State(object):
 
     def _valid_action(self, actor_id, action):
         if action.action_type == ActionType.TRANSLATE:
-            cartesian = action.displacement.cartesian()
-            # Add a small delta for floating point comparison.
-            if math.sqrt(cartesian[0] ** 2 + cartesian[1] ** 2) > 1.001:
-                logger.debug(f"Invalid action: translation too large {action}")
+            x, y = action.displacement.cartesian()
+            if x * x + y * y > MAX_TRANSLATION_DISTANCE_SQUARED:
+                logger.debug("Invalid action: translation too large %s", action)
                 return False
             destination = HecsCoord.add(
                 self._actors[actor_id].location(), action.displacement
@@ -1345,7 +1384,7 @@ class State(object):
             if self._map_provider.edge_between(
                 self._actors[actor_id].location(), destination
             ):
-                logger.debug(f"Invalid action: attempts to move through wall {action}")
+                logger.debug("Invalid action: attempts to move through wall %s", action)
                 return False
             forward_location = (
                 self._actors[actor_id]
@@ -1364,7 +1403,7 @@ class State(object):
                 return False
         if action.action_type == ActionType.ROTATE:
             if abs(action.rotation) > 60.01:
-                logger.debug(f"Invalid action: attempts to rotate too much {action}")
+                logger.debug("Invalid action: attempts to rotate too much %s", action)
                 return False
         return True
 
@@ -1396,8 +1435,7 @@ class State(object):
         if len(self._instructions) > 0:
             self._game_recorder.record_instruction_activated(self._instructions[0])
             self.queue_follower_sound(SoundClipType.INSTRUCTION_RECEIVED)
-        for actor_id in self._actors:
-            self._instructions_stale[actor_id] = True
+        self._instructions_stale.update(dict.fromkeys(self._actors, True))
 
     def _set_scenario(
         self,
@@ -1430,7 +1468,7 @@ class State(object):
         props = scenario.prop_update.props
         cards = [Card.FromProp(prop) for prop in props]
         self._map_provider = MapProvider(MapType.PRESET, scenario.map, cards)
-        self._map_update = self._map_provider.map()
+        self._set_map_update(self._map_provider.map())
         self._prop_update = self._map_provider.prop_update()
         self._prop_update = map_utils.CensorCards(self._prop_update, None)
         # Load in instructions.
@@ -1485,6 +1523,10 @@ class State(object):
         self._mark_instructions_stale()
         # Mark clients as desynced.
         self.desync_all()
+        self._turn_end_monotonic = (
+            time.monotonic()
+            + (scenario.turn_state.turn_end - datetime.utcnow()).total_seconds()
+        )
         self._send_turn_state(scenario.turn_state)
         self._self_initialize()
 
@@ -1517,24 +1559,22 @@ class State(object):
         if self._turn_state == turn_state:
             return
         self._turn_state = turn_state
-        for actor_id in self._actors:
-            if not actor_id in self._turn_history:
-                self._turn_history[actor_id] = Queue()
-            self._turn_history[actor_id].put(dataclasses.replace(turn_state))
+        self._queue_turn_state(turn_state)
+
+    def _turn_expired(self):
+        return time.monotonic() >= self._turn_end_monotonic
 
     def _resend_turn_state(self):
         if self._turn_state is None:
             return
-        for actor_id in self._actors:
-            if not actor_id in self._turn_history:
-                self._turn_history[actor_id] = Queue()
-            self._turn_history[actor_id].put(dataclasses.replace(self._turn_state))
+        self._queue_turn_state(self._turn_state)
+
+    def _queue_turn_state(self, turn_state):
+        # self._turn_state is sometimes modified in place, so queue a copy. The
+        # copy is only read after this, so all players can share it. Clients
+        # only display the latest turn state, so it replaces any unsent one.
+        turn_state = dataclasses.replace(turn_state)
+        self._pending_turn_state.update(dict.fromkeys(self._actors, turn_state))
 
     def _next_turn_state(self, actor_id):
-        if not actor_id in self._turn_history:
-            self._turn_history[actor_id] = Queue()
-        try:
-            turn = self._turn_history[actor_id].get_nowait()
-            return turn
-        except queue.Empty:
-            return None
+        return self._pending_turn_state.pop(actor_id, None)
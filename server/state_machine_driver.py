@@ -8,6 +8,11 @@ from server.util import exc_info_plus
 
 logger = logging.getLogger(__name__)
 
+# Longest time the game loop sleeps without incoming messages. State changes
+# that aren't triggered by messages (turn timeouts, realtime actions, players
+# joining) are picked up within this period.
+IDLE_POLL_PERIOD_S = 0.01
+
 
 class StateMachineDriver(object):
     """
@@ -26,8 +31,13 @@ class StateMachineDriver(object):
 
         # Message output. Each iteration loop, messages are serialized into per-player queues for sending.
         self._messages_out = {}  # Player ID -> Queue() of messages
+        # Set whenever new messages are queued for a player. Lets senders sleep
+        # until there's something to send instead of polling.
+        self._messages_ready = {}  # Player ID -> asyncio.Event()
         # Linear message input. As network packets come in, they are placed in a queue for processing.
         self._messages_in = Queue()  # Queue() of (player_id, message) tuples
+        # Set when messages are drained in. Wakes up the game loop in run().
+        self._messages_arrived = None
 
         self._exception = None
         self._traceback = None
@@ -38,6 +48,8 @@ class StateMachineDriver(object):
     def drain_messages(self, id, messages):
         for m in messages:
             self._messages_in.put((id, m))
+        if self._messages_arrived is not None:
+            self._messages_arrived.set()
 
     def fill_messages(self, player_id, out_messages):
         """Fills out_messages with MessageFromServer objects to send to the
@@ -52,7 +64,7 @@ class StateMachineDriver(object):
             try:
                 message = self._messages_out[player_id].get_nowait()
                 logger.debug(
-                    f"Sent message type {message.type} for player {player_id}."
+                    "Sent message type %s for player %s.", message.type, player_id
                 )
                 out_messages.append(message)
                 packets_added = True
@@ -60,13 +72,33 @@ class StateMachineDriver(object):
                 break
         return packets_added
 
+    async def wait_for_messages(self, player_id, timeout):
+        """Waits until messages are available for the player, or timeout seconds pass.
+
+        Returns True if messages are available.
+        """
+        messages_out = self._messages_out.get(player_id, None)
+        if messages_out is not None and not messages_out.empty():
+            return True
+        if player_id not in self._messages_ready:
+            self._messages_ready[player_id] = asyncio.Event()
+        messages_ready = self._messages_ready[player_id]
+        messages_ready.clear()
+        try:
+            await asyncio.wait_for(messages_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
     async def run(self):
         try:
             last_loop = time.time()
             latency_monitor = self._lobby.latency_monitor() if self._lobby else None
+            self._messages_arrived = asyncio.Event()
             self._state_machine.start()  # Initialize the state machine.
             while not self._state_machine.done():
                 # Run one iteration of the game loop.
+                self._messages_arrived.clear()
                 self.step()
                 poll_period = time.time() - last_loop
                 if (poll_period) > 0.2:
@@ -76,7 +108,13 @@ class StateMachineDriver(object):
                     if latency_monitor:
                         latency_monitor.accumulate_latency(poll_period)
                 last_loop = time.time()
-                await asyncio.sleep(0)
+                # Sleep until a message arrives instead of spinning.
+                try:
+                    await asyncio.wait_for(
+                        self._messages_arrived.wait(), IDLE_POLL_PERIOD_S
+                    )
+                except asyncio.TimeoutError:
+                    pass
             self._state_machine.on_game_over()
         except Exception as e:
             logger.exception(f"Error in game {self._room_id}: {e}")
@@ -123,3 +161,5 @@ class StateMachineDriver(object):
             if self._state_machine.fill_messages(player_id, out_messages):
                 for message in out_messages:
                     self._messages_out[player_id].put(message)
+                if player_id in self._messages_ready:
+                    self._messages_ready[player_id].set()
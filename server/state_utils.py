@@ -11,23 +11,22 @@ FOLLOWER_SECONDS_PER_TURN = 15
 
 FOLLOWER_TURN_END_DELAY_SECONDS = 1
 
+# Translations move an actor to an adjacent tile, a distance of 1. Compared
+# squared to skip the sqrt, with a small delta for floating point comparison.
+MAX_TRANSLATION_DISTANCE_SQUARED = 1.001**2
+
 logger = logging.getLogger(__name__)
 
 
+# Turns added for completing a set, indexed by score. Later sets add no turns.
+TURN_REWARDS = (5, 4, 4, 3, 3, 2, 2, 1, 1)
+
+
 def turn_reward(score):
     """Calculates the turn reward (# of turns added) for a given score."""
-    if score == 0:
-        return 5
-    elif score in [1, 2]:
-        return 4
-    elif score in [3, 4]:
-        return 3
-    elif score in [5, 6]:
-        return 2
-    elif score in [7, 8]:
-        return 1
-    else:
-        return 0
+    if 0 <= score < len(TURN_REWARDS):
+        return TURN_REWARDS[score]
+    return 0
 
 
 def cumulative_turns_added(score):
@@ -0,0 +1,53 @@
+"""Unit tests for game message log entries."""
+import dataclasses
+import unittest
+from datetime import datetime
+
+import orjson
+
+from server.messages import message_from_server
+from server.messages.logs import (
+    EncodedLogEntryFromOutgoingMessage,
+    LogEntry,
+    LogEntryFromOutgoingMessage,
+)
+from server.messages.map_update import MapMetadata, MapUpdate
+from server.messages.prop import PropUpdate
+
+
+class EncodedLogEntryTest(unittest.TestCase):
+    """Checks log entries built from encoded messages against orjson's output."""
+
+    def test_matches_encoded_log_entry(self):
+        map_update = MapUpdate(3, 4, [], MapMetadata([], [], [], [], 0))
+        messages = [
+            message_from_server.MapUpdateFromServer(map_update),
+            message_from_server.PropUpdateFromServer(PropUpdate([])),
+            message_from_server.PingMessageFromServer(),
+        ]
+        for player_id in [0, 17]:
+            for message in messages:
+                self.assertEqual(
+                    EncodedLogEntryFromOutgoingMessage(player_id, message.to_bytes()),
+                    orjson.dumps(
+                        LogEntryFromOutgoingMessage(player_id, message),
+                        option=message_from_server.ORJSON_OPTIONS,
+                        default=datetime.isoformat,
+                    ),
+                )
+
+    def test_log_entry_field_order(self):
+        """EncodedLogEntryFromOutgoingMessage() writes the fields in this order."""
+        self.assertEqual(
+            [field.name for field in dataclasses.fields(LogEntry)],
+            [
+                "message_direction",
+                "player_id",
+                "message_from_server",
+                "message_to_server",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
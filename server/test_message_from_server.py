@@ -0,0 +1,60 @@
+"""Unit tests for encoding messages sent from the server."""
+import dataclasses
+import unittest
+from datetime import datetime
+
+from server.messages import message_from_server
+from server.messages.map_update import MapMetadata, MapUpdate
+from server.messages.prop import PropUpdate
+
+MessageFromServer = message_from_server.MessageFromServer
+
+
+class ReplaceTransmitTimeTest(unittest.TestCase):
+    """Checks re-stamped encodings against freshly encoded messages."""
+
+    def setUp(self):
+        map_update = MapUpdate(3, 4, [], MapMetadata([], [], [], [], 0))
+        self.messages = [
+            message_from_server.MapUpdateFromServer(map_update),
+            message_from_server.PropUpdateFromServer(PropUpdate([])),
+            message_from_server.PingMessageFromServer(),
+        ]
+
+    def assertRestampMatches(self, transmit_time):
+        for message in self.messages:
+            restamped = dataclasses.replace(message, transmit_time=transmit_time)
+            self.assertEqual(
+                message_from_server.ReplaceTransmitTime(
+                    message.to_bytes(), transmit_time
+                ),
+                restamped.to_bytes(),
+            )
+
+    def test_restamp_matches_encoding(self):
+        self.assertRestampMatches(datetime(2023, 4, 5, 6, 7, 8, 123456))
+
+    def test_restamp_without_microseconds(self):
+        # isoformat() leaves out the fraction entirely, shortening the field.
+        self.assertRestampMatches(datetime(2023, 4, 5, 6, 7, 8))
+
+    def test_restamp_twice(self):
+        first_time = datetime(2023, 4, 5, 6, 7, 8)
+        second_time = datetime(2023, 4, 5, 6, 7, 9, 500)
+        for message in self.messages:
+            message_bytes = message_from_server.ReplaceTransmitTime(
+                message.to_bytes(), first_time
+            )
+            message_bytes = message_from_server.ReplaceTransmitTime(
+                message_bytes, second_time
+            )
+            restamped = dataclasses.replace(message, transmit_time=second_time)
+            self.assertEqual(message_bytes, restamped.to_bytes())
+
+    def test_transmit_time_is_first_field(self):
+        """ReplaceTransmitTime() relies on transmit_time being encoded first."""
+        self.assertEqual(dataclasses.fields(MessageFromServer)[0].name, "transmit_time")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Unit tests for parsing messages sent to the server."""
+import unittest
+from datetime import datetime
+
+import orjson
+
+from server.messages import message_to_server
+from server.messages.objective import ObjectiveMessage
+from server.messages.turn_state import TurnComplete
+
+MessageToServer = message_to_server.MessageToServer
+MessageType = message_to_server.MessageType
+
+
+def Encode(message):
+    return orjson.dumps(
+        message, option=orjson.OPT_NAIVE_UTC, default=datetime.isoformat
+    )
+
+
+class TestListFromFrame(unittest.TestCase):
+    def setUp(self):
+        self.turn_complete = MessageToServer(
+            datetime.utcnow(),
+            MessageType.TURN_COMPLETE,
+            turn_complete=TurnComplete(),
+        )
+        self.objective = MessageToServer(
+            datetime.utcnow(),
+            MessageType.OBJECTIVE,
+            objective=ObjectiveMessage(text="Walk forwards"),
+        )
+
+    def assertParsed(self, messages):
+        self.assertEqual(
+            [message.type for message in messages],
+            [MessageType.TURN_COMPLETE, MessageType.OBJECTIVE],
+        )
+        self.assertEqual(messages[1].objective.text, "Walk forwards")
+
+    def test_single_message(self):
+        messages = MessageToServer.list_from_frame(Encode(self.turn_complete))
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].type, MessageType.TURN_COMPLETE)
+
+    def test_batched_messages(self):
+        frame = b"\n".join([Encode(self.turn_complete), Encode(self.objective)])
+        self.assertParsed(MessageToServer.list_from_frame(frame))
+
+    def test_empty_lines_skipped(self):
+        frame = b"\n".join(
+            [b"", Encode(self.turn_complete), b"", Encode(self.objective), b""]
+        )
+        self.assertParsed(MessageToServer.list_from_frame(frame))
+        self.assertEqual(MessageToServer.list_from_frame(b""), [])
+
+    def test_text_frame(self):
+        frame = "\n".join(
+            [
+                Encode(self.turn_complete).decode("utf-8"),
+                Encode(self.objective).decode("utf-8"),
+                "",
+            ]
+        )
+        self.assertParsed(MessageToServer.list_from_frame(frame))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""Unit tests for Room's encoding of outgoing messages."""
+import dataclasses
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = ""  # Hide pygame welcome message
+
+from server.config.config import Config, SetGlobalConfig
+from server.lobbies.open_lobby import OpenLobby
+from server.lobby import LobbyInfo, LobbyType
+from server.messages import message_from_server
+from server.messages.map_update import MapMetadata, MapUpdate
+from server.messages.prop import PropUpdate
+from server.room import Room
+from server.schemas.base import (
+    ConnectDatabase,
+    CreateTablesIfNotExists,
+    SetDatabaseForTesting,
+)
+from server.schemas.defaults import ListDefaultTables
+from server.schemas.game import Game
+
+MessageFromServer = message_from_server.MessageFromServer
+
+
+def Restamped(message, seconds):
+    """Returns a copy of message, sent the given number of seconds later."""
+    return dataclasses.replace(
+        message, transmit_time=message.transmit_time + timedelta(seconds=seconds)
+    )
+
+
+class EncodeMessageTest(unittest.TestCase):
+    """Tests Room's reuse of map & prop update encodings."""
+
+    def setUp(self):
+        SetGlobalConfig(Config(comment="Room Unit Test Config"))
+        SetDatabaseForTesting()
+        ConnectDatabase()
+        CreateTablesIfNotExists(ListDefaultTables())
+        self.log_directory = tempfile.TemporaryDirectory()
+        lobby = OpenLobby(
+            LobbyInfo("Test Lobby", LobbyType.OPEN, "Unit test...", 40, 1, False)
+        )
+        self.room = Room(
+            "Test Room", 2, 0, Game(log_directory=self.log_directory.name), lobby
+        )
+        self.map_update = MapUpdate(3, 4, [], MapMetadata([], [], [], [], 0))
+        self.prop_update = PropUpdate([])
+
+    def tearDown(self):
+        # The room's game loop never ran, so stop() won't close its logs.
+        self.room._messages_from_server_log.close()
+        self.room._messages_to_server_log.close()
+        self.log_directory.cleanup()
+
+    def _encode(self, message):
+        """Encodes message with the room, returning (bytes, to_bytes() calls)."""
+        with mock.patch.object(
+            MessageFromServer,
+            "to_bytes",
+            autospec=True,
+            side_effect=MessageFromServer.to_bytes,
+        ) as to_bytes:
+            message_bytes = self.room._encode_message(message)
+        return message_bytes, to_bytes.call_count
+
+    def assertReused(self, first, second):
+        self._encode(first)
+        message_bytes, encodings = self._encode(second)
+        self.assertEqual(encodings, 0)
+        self.assertEqual(message_bytes, second.to_bytes())
+
+    def test_reused_map_update_matches_encoding(self):
+        first = message_from_server.MapUpdateFromServer(self.map_update)
+        self.assertReused(first, Restamped(first, 1))
+
+    def test_reused_prop_update_matches_encoding(self):
+        first = message_from_server.PropUpdateFromServer(self.prop_update)
+        self.assertReused(first, Restamped(first, 1))
+
+    def test_leader_and_follower_views_reused(self):
+        """Encodings of both players' views are kept, as they alternate."""
+        follower_map = dataclasses.replace(self.map_update, rows=5)
+        leader = message_from_server.MapUpdateFromServer(self.map_update)
+        follower = message_from_server.MapUpdateFromServer(follower_map)
+        self._encode(leader)
+        self._encode(follower)
+        self.assertReused(leader, Restamped(leader, 1))
+        self.assertReused(follower, Restamped(follower, 1))
+
+    def test_new_payload_is_encoded(self):
+        """Payloads are matched by identity, so a new update is re-encoded."""
+        first = message_from_server.MapUpdateFromServer(self.map_update)
+        self._encode(first)
+        # Equal to the first update, but a new object.
+        for map_update in [
+            dataclasses.replace(self.map_update),
+            dataclasses.replace(self.map_update, rows=5),
+        ]:
+            message = Restamped(message_from_server.MapUpdateFromServer(map_update), 1)
+            message_bytes, encodings = self._encode(message)
+            self.assertEqual(encodings, 1)
+            self.assertEqual(message_bytes, message.to_bytes())
+
+    def test_other_types_not_reused(self):
+        first = message_from_server.PingMessageFromServer()
+        self._encode(first)
+        _, encodings = self._encode(Restamped(first, 1))
+        self.assertEqual(encodings, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
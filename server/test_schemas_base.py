@@ -0,0 +1,49 @@
+"""Unit tests for database setup."""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import peewee
+
+from server.config.config import Config
+from server.schemas.base import (
+    CloseDatabase,
+    ConnectDatabase,
+    GetDatabase,
+    SetDatabaseReadOnly,
+)
+
+
+class ReadOnlyDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.data_directory = tempfile.TemporaryDirectory()
+        # Characters which have a special meaning in sqlite file: URIs.
+        data_prefix = os.path.join(self.data_directory.name, "game data #1 ?%")
+        os.makedirs(data_prefix)
+        self.config = Config(data_prefix=data_prefix)
+        connection = sqlite3.connect(self.config.database_path())
+        connection.execute("CREATE TABLE game (id INTEGER PRIMARY KEY)")
+        connection.execute("INSERT INTO game (id) VALUES (7)")
+        connection.commit()
+        connection.close()
+
+    def tearDown(self):
+        CloseDatabase()
+        self.data_directory.cleanup()
+
+    def test_opens_path_with_uri_characters(self):
+        SetDatabaseReadOnly(self.config)
+        ConnectDatabase()
+        rows = GetDatabase().execute_sql("SELECT id FROM game").fetchall()
+        self.assertEqual(rows, [(7,)])
+
+    def test_writes_fail(self):
+        SetDatabaseReadOnly(self.config)
+        ConnectDatabase()
+        with self.assertRaises(peewee.OperationalError):
+            GetDatabase().execute_sql("INSERT INTO game (id) VALUES (8)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,13 @@
 """Unit tests for state machine code."""
+import dataclasses
 import logging
 import os
+import time
 import unittest
+from datetime import datetime
+from unittest import mock
+
+import time_machine
 
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = ""  # Hide pygame welcome message
 
@@ -11,14 +17,19 @@ from py_client.local_game_coordinator import LocalGameCoordinator
 from server.config.config import Config, SetGlobalConfig
 from server.lobbies.open_lobby import OpenLobby
 from server.lobby import LobbyInfo, LobbyType
+from server.map_provider import MapProvider, MapType
+from server.messages import action as action_module
+from server.messages import message_from_server, message_to_server
 from server.messages.rooms import Role
+from server.messages.scenario import ScenarioRequest, ScenarioRequestType
+from server.scenario_state import ScenarioState
 from server.schemas.base import (
     ConnectDatabase,
     CreateTablesIfNotExists,
     SetDatabaseForTesting,
 )
 from server.schemas.defaults import ListDefaultTables
-from server.state import FOLLOWER_MOVES_PER_TURN, LEADER_MOVES_PER_TURN
+from server.state import FOLLOWER_MOVES_PER_TURN, LEADER_MOVES_PER_TURN, State
 
 logger = logging.getLogger(__name__)
 
@@ -231,5 +242,127 @@ class RandomRealtimeLocalSelfPlayTest(unittest.TestCase):
             follower_moved = False
 
 
+class ScenarioMapTest(unittest.TestCase):
+    """Checks that the follower is sent the same map as the leader in scenarios."""
+
+    def setUp(self):
+        logging.basicConfig(level=logging.INFO)
+        SetGlobalConfig(Config(comment="Scenario Map Unit Test Config"))
+        SetDatabaseForTesting()
+        ConnectDatabase()
+        CreateTablesIfNotExists(ListDefaultTables())
+        lobby = OpenLobby(
+            LobbyInfo("Test Lobby", LobbyType.OPEN, "Unit test...", 40, 1, False)
+        )
+        self.scenario_state = ScenarioState(
+            "Test Room", None, log_to_db=False, lobby=lobby
+        )
+        self.leader_id = self.scenario_state.create_actor(Role.LEADER)
+        self.follower_id = self.scenario_state.create_actor(Role.FOLLOWER)
+
+    def _sent_map_updates(self, player_id):
+        messages = []
+        self.scenario_state.fill_messages(player_id, messages)
+        return [
+            message.map_update
+            for message in messages
+            if message.type == message_from_server.MessageType.MAP_UPDATE
+        ]
+
+    def test_follower_map_matches_scenario_map(self):
+        # Before a scenario is loaded, both players see the placeholder map.
+        (leader_map,) = self._sent_map_updates(self.leader_id)
+        (follower_map,) = self._sent_map_updates(self.follower_id)
+        self.assertEqual(follower_map, leader_map)
+
+        scenario_map = MapProvider(MapType.RANDOM).map()
+        scenario = dataclasses.replace(
+            self.scenario_state._state._get_scenario(self.leader_id, ""),
+            map=scenario_map,
+        )
+        load_request = message_to_server.MessageToServer(
+            datetime.utcnow(),
+            message_to_server.MessageType.SCENARIO_REQUEST,
+            scenario_request=ScenarioRequest(
+                ScenarioRequestType.LOAD_SCENARIO, scenario.to_json()
+            ),
+        )
+        self.scenario_state.drain_messages(self.leader_id, [load_request])
+
+        (leader_map,) = self._sent_map_updates(self.leader_id)
+        (follower_map,) = self._sent_map_updates(self.follower_id)
+        self.assertEqual(follower_map, leader_map)
+        self.assertEqual(follower_map.tiles, scenario_map.tiles)
+
+
+class TurnTimerTest(unittest.TestCase):
+    """Checks that turns time out on the monotonic clock, not the wall clock."""
+
+    def setUp(self):
+        logging.basicConfig(level=logging.INFO)
+        SetGlobalConfig(Config(comment="Turn Timer Unit Test Config"))
+        SetDatabaseForTesting()
+        ConnectDatabase()
+        CreateTablesIfNotExists(ListDefaultTables())
+        lobby = OpenLobby(
+            LobbyInfo("Test Lobby", LobbyType.OPEN, "Unit test...", 40, 1, False)
+        )
+        self.state = State("Test Room", None, log_to_db=False, lobby=lobby)
+        self.leader_id = self.state.create_actor(Role.LEADER)
+        self.state.create_actor(Role.FOLLOWER)
+        self.state.update()
+        self.turn_state = self.state.turn_state()
+        self.turn_duration_s = (
+            self.turn_state.turn_end - datetime.utcnow()
+        ).total_seconds()
+        self.monotonic_turn_end = time.monotonic() + self.turn_duration_s
+
+    def test_wall_clock_jump_does_not_end_turn(self):
+        with time_machine.travel(time.time() + 2 * self.turn_duration_s, tick=False):
+            self.state.update()
+        self.assertEqual(self.state.turn_state(), self.turn_state)
+
+    def assertTurnEndsOnTime(self):
+        with mock.patch("time.monotonic", return_value=self.monotonic_turn_end - 1):
+            self.state.update()
+        self.assertEqual(self.state.turn_state().turn, Role.LEADER)
+        self.assertEqual(
+            self.state.turn_state().turn_number, self.turn_state.turn_number
+        )
+        with mock.patch("time.monotonic", return_value=self.monotonic_turn_end + 1):
+            self.state.update()
+        # With no instructions to follow, the follower's turn is skipped.
+        self.assertEqual(
+            self.state.turn_state().turn_number, self.turn_state.turn_number + 1
+        )
+
+    def test_turn_ends_after_duration(self):
+        with mock.patch("time.monotonic", return_value=self.monotonic_turn_end - 1):
+            self.state.update()
+        self.assertEqual(self.state.turn_state(), self.turn_state)
+        self.assertTurnEndsOnTime()
+
+    def test_move_after_wall_clock_jump_keeps_deadline(self):
+        """Turn updates sent after a wall clock jump don't move the deadline."""
+        with time_machine.travel(time.time() + 2 * self.turn_duration_s, tick=False):
+            turn = action_module.Turn(self.leader_id, 60)
+            self.state.drain_messages(
+                self.leader_id,
+                [
+                    message_to_server.MessageToServer(
+                        datetime.utcnow(),
+                        message_to_server.MessageType.ACTIONS,
+                        actions=[turn],
+                    )
+                ],
+            )
+            self.state.update()
+        self.assertEqual(
+            self.state.turn_state().moves_remaining,
+            self.turn_state.moves_remaining - 1,
+        )
+        self.assertTurnEndsOnTime()
+
+
 if __name__ == "__main__":
     unittest.main()
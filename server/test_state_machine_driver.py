@@ -0,0 +1,103 @@
+"""Unit tests for the event-driven game loop in StateMachineDriver."""
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from server.messages import message_from_server
+from server.state_machine_driver import IDLE_POLL_PERIOD_S, StateMachineDriver
+
+PLAYER_ID = 0
+
+
+class EchoStateMachine(object):
+    """Minimal state machine which echoes each message back to its sender."""
+
+    def __init__(self):
+        self.updates = 0
+        self._done = False
+        self._pending = []
+
+    def start(self):
+        pass
+
+    def done(self):
+        return self._done
+
+    def end_game(self):
+        self._done = True
+
+    def on_game_over(self):
+        pass
+
+    def update(self):
+        self.updates += 1
+
+    def player_ids(self):
+        return [PLAYER_ID]
+
+    def drain_messages(self, id, messages):
+        self._pending.extend(messages)
+
+    def fill_messages(self, player_id, out_messages):
+        if len(self._pending) == 0:
+            return False
+        out_messages.extend(self._pending)
+        self._pending = []
+        return True
+
+
+class StateMachineDriverTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.state_machine = EchoStateMachine()
+        self.driver = StateMachineDriver(self.state_machine, "Test Room")
+        self.driver_task = asyncio.create_task(self.driver.run())
+        # Let run() start the game loop.
+        await asyncio.sleep(0)
+
+    async def asyncTearDown(self):
+        self.driver.end_game()
+        # Wake the game loop so it sees that the game is over.
+        self.driver.drain_messages(PLAYER_ID, [])
+        await asyncio.wait_for(self.driver_task, 1)
+        self.assertIsNone(self.driver.exception())
+
+    async def test_queued_message_wakes_waiter(self):
+        """A player waiting for messages wakes up as soon as one is queued."""
+        waiter = asyncio.create_task(self.driver.wait_for_messages(PLAYER_ID, 10))
+        await asyncio.sleep(0)
+        ping = message_from_server.PingMessageFromServer()
+        start = time.monotonic()
+        self.driver.drain_messages(PLAYER_ID, [ping])
+        self.assertTrue(await asyncio.wait_for(waiter, 1))
+        self.assertLess(time.monotonic() - start, 1)
+        out_messages = []
+        self.assertTrue(self.driver.fill_messages(PLAYER_ID, out_messages))
+        self.assertEqual(out_messages, [ping])
+
+    async def test_incoming_message_wakes_game_loop(self):
+        """Messages are processed right away, not after the idle period."""
+        with mock.patch("server.state_machine_driver.IDLE_POLL_PERIOD_S", 10):
+            # Let the game loop settle into a long idle wait.
+            await asyncio.sleep(IDLE_POLL_PERIOD_S * 5)
+            updates_before = self.state_machine.updates
+            waiter = asyncio.create_task(self.driver.wait_for_messages(PLAYER_ID, 10))
+            await asyncio.sleep(0)
+            self.driver.drain_messages(
+                PLAYER_ID, [message_from_server.PingMessageFromServer()]
+            )
+            self.assertTrue(await asyncio.wait_for(waiter, 1))
+            self.assertGreater(self.state_machine.updates, updates_before)
+
+    async def test_wait_times_out_without_messages(self):
+        self.assertFalse(await self.driver.wait_for_messages(PLAYER_ID, 0.05))
+
+    async def test_idle_loop_keeps_updating(self):
+        """Without messages, the state machine is still updated every period."""
+        updates_before = self.state_machine.updates
+        await asyncio.sleep(IDLE_POLL_PERIOD_S * 10)
+        self.assertGreaterEqual(self.state_machine.updates - updates_before, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,5 @@
 import dataclasses
 import logging
-import math
 import random
 import uuid
 from datetime import datetime, timedelta
@@ -39,6 +38,7 @@ from server.messages.tutorials import (
     TutorialRequestType,
     TutorialResponseFromStep,
 )
+from server.state_utils import MAX_TRANSLATION_DISTANCE_SQUARED
 from server.tutorial_steps import LoadTutorialSteps
 
 LEADER_MOVES_PER_TURN = -1
@@ -123,7 +123,7 @@ class TutorialGameState(object):
             0,
             0,
         )
-        self._turn_history = {}
+        self._pending_turn_state = {}  # Maps from player_id -> latest TurnState.
         self.record_turn_state(initial_turn)
 
         self._tutorial_record.save()
@@ -156,18 +156,14 @@ class TutorialGameState(object):
     def record_turn_state(self, turn_state):
         # Record a copy of the current turn state.
         self._turn_state = turn_state
+        # Players share one copy, as queued turn states are only read. Only the
+        # latest turn state is kept for each player.
+        turn_state = dataclasses.replace(turn_state)
         for actor_id in self._actors:
-            if not actor_id in self._turn_history:
-                self._turn_history[actor_id] = Queue()
-            self._turn_history[actor_id].put(dataclasses.replace(turn_state))
+            self._pending_turn_state[actor_id] = turn_state
 
     def _next_turn_state(self, actor_id):
-        if not actor_id in self._turn_history:
-            self._turn_history[actor_id] = Queue()
-        if self._turn_history[actor_id].empty():
-            return None
-        turn = self._turn_history[actor_id].get()
-        return turn
+        return self._pending_turn_state.pop(actor_id, None)
 
     def end_game(self):
         """Terminates the current game."""
@@ -209,10 +205,10 @@ class TutorialGameState(object):
                 move.instruction = last_obj_record
         move.character_role = actor.role()
         if actor.role == Role.LEADER:
-            print(self._tutorial_record.leader.hashed_id)
+            logger.debug(self._tutorial_record.leader.hashed_id)
             move.worker = self._tutorial_record.leader
         if actor.role == Role.FOLLOWER:
-            print(self._tutorial_record.leader.hashed_id)
+            logger.debug(self._tutorial_record.leader.hashed_id)
             move.worker = self._tutorial_record.follower
         move.action = proposed_action
         move.position_before = actor.location()
@@ -534,12 +530,13 @@ class TutorialGameState(object):
         return record
 
     def check_for_stepped_on_cards(self, actor_id, action, color):
+        # Only moving onto a card can select it.
+        if action.action_type != ActionType.TRANSLATE:
+            return
         actor = self._actors[actor_id]
         stepped_on_card = self._map_provider.card_by_location(actor.location())
         # If the actor just moved and stepped on a card, mark it as selected.
-        if (action.action_type == ActionType.TRANSLATE) and (
-            stepped_on_card is not None
-        ):
+        if stepped_on_card is not None:
             logger.info(
                 f"Player {actor.actor_id()} stepped on card {str(stepped_on_card)}."
             )
@@ -789,7 +786,7 @@ class TutorialGameState(object):
         spawn_point = (
             self._spawn_points.pop() if self._spawn_points else HecsCoord(0, 0, 0)
         )
-        print(spawn_point)
+        logger.debug(f"Spawn point: {spawn_point}")
         asset_id = AssetId.PLAYER if role == Role.LEADER else AssetId.FOLLOWER_BOT
         actor = Actor(self._id_assigner.alloc(), asset_id, role, spawn_point, realtime)
         self._actors[actor.actor_id()] = actor
@@ -820,8 +817,8 @@ class TutorialGameState(object):
             del self._action_history[actor_id]
         if actor_id in self._objectives_stale:
             del self._objectives_stale[actor_id]
-        if actor_id in self._turn_history:
-            del self._turn_history[actor_id]
+        if actor_id in self._pending_turn_state:
+            del self._pending_turn_state[actor_id]
         self._id_assigner.free(actor_id)
         # Mark clients as desynced.
         self.desync_all()
@@ -854,7 +851,7 @@ class TutorialGameState(object):
                 return True
             if self._objectives_stale[actor_id]:
                 return True
-            if not self._turn_history[actor_id].empty():
+            if actor_id in self._pending_turn_state:
                 return True
             if not self._tutorial_responses.empty():
                 return True
@@ -1053,9 +1050,8 @@ class TutorialGameState(object):
 
     def valid_action(self, actor_id, action):
         if action.action_type == ActionType.TRANSLATE:
-            cartesian = action.displacement.cartesian()
-            # Add a small delta for floating point comparison.
-            if math.sqrt(cartesian[0] ** 2 + cartesian[1] ** 2) > 1.001:
+            x, y = action.displacement.cartesian()
+            if x * x + y * y > MAX_TRANSLATION_DISTANCE_SQUARED:
                 return False
         if action.action_type == ActionType.ROTATE:
             if action.rotation > 60.01: